@@ -1,13 +1,28 @@
 import os
 import re
-import time
 import json
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 from supabase import create_client, Client
 from dotenv import load_dotenv, find_dotenv
 
+from scraping.archive import archive_from_env, dry_run_from_env
+from scraping.categories import get_category
+from scraping.dedup import KnownIds
+from scraping.html_text import clean_html
+from scraping.fingerprints import BoardFingerprints, append_closed_events, item_hash
+from scraping.http_cache import ValidatorCache, cache_key, conditional_get
+from scraping.http_client import HostUnavailable, PoliteSession
+from scraping.metrics import METRICS
+from scraping.near_dup import NearDupIndex
+from scraping.remote_filter import REMOTE_ANYWHERE
+from scraping.sitemap import CHUNK_SIZE, iter_sitemap
+from scraping.sources import Source, run_sources
+from scraping.writer import BatchWriter, dry_run, supabase_update, supabase_upsert
+
 # --- 1. SETUP & AUTH ---
 USER_AGENT = (
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -15,9 +30,6 @@ USER_AGENT = (
     "Chrome/120.0.0.0 Safari/537.36"
 )
 
-SESSION = requests.Session()
-SESSION.headers.update({"User-Agent": USER_AGENT})
-
 # Load .env.local or .env
 env_file = find_dotenv('.env.local') or find_dotenv('.env')
 print(f"Loading environment variables from: {env_file}")
@@ -37,7 +49,27 @@ print("Supabase client initialized.")
 MAX_COMPANIES_PER_ATS = int(os.environ.get("ATS_MAX_COMPANIES", "150"))
 MAX_JOBS_PER_COMPANY = int(os.environ.get("ATS_MAX_JOBS_PER_COMPANY", "200"))
 REQUEST_TIMEOUT = int(os.environ.get("ATS_REQUEST_TIMEOUT", "20"))
+# Per-host pacing: bursts of up to ATS_BURST requests, then one every
+# ATS_SLEEP_SECONDS (stretched automatically while a host answers 429/503)
 SLEEP_BETWEEN_REQUESTS = float(os.environ.get("ATS_SLEEP_SECONDS", "0.3"))
+REQUEST_BURST = int(os.environ.get("ATS_BURST", "1"))
+MAX_RETRIES = int(os.environ.get("ATS_MAX_RETRIES", "3"))
+ATS_WORKERS = max(1, int(os.environ.get("ATS_WORKERS", "8")))
+# Give up on a provider (keeping what it already produced) after this many seconds
+SOURCE_TIMEOUT = float(os.environ.get("ATS_SOURCE_TIMEOUT", "1800"))
+# Optional local file that remembers stored external_ids between runs
+KNOWN_IDS_CACHE = os.environ.get("ATS_KNOWN_IDS_CACHE")
+WRITE_BATCH_SIZE = int(os.environ.get("ATS_WRITE_BATCH_SIZE", "100"))
+WRITE_FLUSH_SECONDS = float(os.environ.get("ATS_WRITE_FLUSH_SECONDS", "5"))
+# Optional local file holding ETag/Last-Modified/body hashes between runs
+HTTP_CACHE_PATH = os.environ.get("ATS_HTTP_CACHE")
+# Optional per-company job-id/hash snapshot; only new or changed jobs get processed
+FINGERPRINTS_PATH = os.environ.get("ATS_FINGERPRINTS")
+# Optional JSONL log of postings that disappeared from their board
+CLOSED_EVENTS_PATH = os.environ.get("ATS_CLOSED_EVENTS")
+# Optional file for the cross-source duplicate index (seeded from the table on
+# first run and pruned on later ones; without it every run reads the table)
+NEAR_DUP_INDEX_PATH = os.environ.get("ATS_NEAR_DUP_INDEX")
 
 ATS_CONFIG = {
     "greenhouse": {
@@ -59,82 +91,136 @@ ATS_CONFIG = {
         "sitemap": "https://apply.workable.com/sitemap.xml",
         "company_regex": re.compile(r"apply\.workable\.com/([^/]+)/"),
         "jobs_api": "https://apply.workable.com/api/v3/accounts/{company}/jobs",
+        "jobs_params": {"state": "published"},
         "source_domain": "workable.com",
     },
 }
 
+# HTTP_ARCHIVE records raw responses; with HTTP_REPLAY=1 they are replayed
+# offline instead of fetched (see scraping/archive.py), and nothing is
+# written unless HTTP_REPLAY_WRITES=1
+ARCHIVE, REPLAY = archive_from_env()
+DRY_RUN = dry_run_from_env()
+SESSION = PoliteSession(
+    interval=SLEEP_BETWEEN_REQUESTS, burst=REQUEST_BURST, max_retries=MAX_RETRIES,
+    archive=ARCHIVE, replay=REPLAY,
+)
+SESSION.headers.update({"User-Agent": USER_AGENT})
+
+# Each provider talks to its own API host with up to ATS_WORKERS threads,
+# so give every host pool that many keep-alive connections.
+_adapter = HTTPAdapter(pool_connections=len(ATS_CONFIG) * 2, pool_maxsize=ATS_WORKERS)
+SESSION.mount("https://", _adapter)
+SESSION.mount("http://", _adapter)
+
 # --- 3. HELPERS ---
 
-def fetch(url, params=None):
-    try:
-        resp = SESSION.get(url, params=params, timeout=REQUEST_TIMEOUT)
-        if resp.status_code >= 400:
-            return None, resp.status_code
-        return resp, resp.status_code
-    except Exception:
-        return None, 0
+HTTP_CACHE = ValidatorCache(HTTP_CACHE_PATH)
 
 
-def parse_sitemap_urls(xml_text):
-    soup = BeautifulSoup(xml_text, "xml")
-    locs = [loc.get_text(strip=True) for loc in soup.find_all("loc")]
-    return locs
+def fetch(url, params=None, skip_unchanged=False):
+    # With skip_unchanged, a 304 or an identical body comes back as (None, 304)
+    # so the caller can skip parsing a payload it already handled last run.
+    # SESSION has already retried transient failures; what's left is reported.
+    cache = HTTP_CACHE if skip_unchanged else None
+    try:
+        resp, unchanged = conditional_get(SESSION, url, cache, params=params, timeout=REQUEST_TIMEOUT)
+    except HostUnavailable:
+        return None, 0  # already reported when the host's circuit opened
+    except requests.RequestException as e:
+        print(f"  - Request failed for {url}: {e}")
+        return None, 0
+    if resp.status_code >= 400:
+        if resp.status_code != 404:
+            print(f"  - {url} answered {resp.status_code}")
+        return None, resp.status_code
+    if unchanged:
+        return None, 304
+    return resp, resp.status_code
+
+
+def stream_sitemap(url):
+    # Yields (is_index, loc) while the body is still downloading; closing the
+    # generator early drops the connection.
+    try:
+        with SESSION.get(url, timeout=REQUEST_TIMEOUT, stream=True) as resp:
+            if resp.status_code >= 400:
+                return
+            yield from iter_sitemap(resp.iter_content(CHUNK_SIZE))
+    except Exception as e:
+        print(f"  - Could not read sitemap {url}: {e}")
+
+
+class CompanyCollector:
+    # Thread-safe set of company slugs that stops accepting at `limit`.
+    def __init__(self, regex, limit):
+        self.regex = regex
+        self.limit = limit
+        self.companies = set()
+        self._lock = threading.Lock()
+
+    @property
+    def full(self):
+        return len(self.companies) >= self.limit
+
+    def scan(self, entries):
+        # Returns the child sitemaps listed if `entries` came from an index.
+        children = []
+        if self.full:
+            return children
+        for is_index, loc in entries:
+            if is_index:
+                children.append(loc)
+                continue
+            m = self.regex.search(loc)
+            if m:
+                with self._lock:
+                    if len(self.companies) < self.limit:
+                        self.companies.add(m.group(1).strip())
+            if self.full:
+                break
+        return children
 
 
 def discover_companies_from_sitemap(ats_key):
     cfg = ATS_CONFIG[ats_key]
     sitemap_url = cfg["sitemap"]
-    regex = cfg["company_regex"]
 
-    companies = set()
+    resp, code = fetch(sitemap_url, skip_unchanged=True)
+    if code == 304:
+        # Only a leaf sitemap has its companies cached: an index can stay
+        # unchanged while the child sitemaps it points to gain companies.
+        cached = HTTP_CACHE.get_derived(sitemap_url)
+        if cached:
+            print(f"  - Sitemap unchanged, reusing {len(cached)} companies")
+            return set(cached)
+        resp, code = fetch(sitemap_url)
 
-    resp, code = fetch(sitemap_url)
     if not resp:
         print(f"  - Could not fetch sitemap: {sitemap_url} (status={code})")
-        return companies
-
-    locs = parse_sitemap_urls(resp.text)
-
-    # If this is a sitemap index, follow a limited number of child sitemaps
-    if any(".xml" in loc for loc in locs):
-        # Try to detect sitemapindex by checking if many locs end with .xml
-        xml_locs = [loc for loc in locs if loc.endswith(".xml")]
-        if xml_locs:
-            for child in xml_locs[:10]:
-                child_resp, child_code = fetch(child)
-                if not child_resp:
-                    continue
-                child_locs = parse_sitemap_urls(child_resp.text)
-                for url in child_locs:
-                    m = regex.search(url)
-                    if m:
-                        companies.add(m.group(1).strip())
-                        if len(companies) >= MAX_COMPANIES_PER_ATS:
-                            return companies
-                time.sleep(SLEEP_BETWEEN_REQUESTS)
-            return companies
-
-    # Otherwise treat as a direct sitemap of URLs
-    for url in locs:
-        m = regex.search(url)
-        if m:
-            companies.add(m.group(1).strip())
-            if len(companies) >= MAX_COMPANIES_PER_ATS:
-                break
+        return set()
 
-    return companies
-
-
-def clean_html(html_content):
-    if not html_content:
-        return "No description"
-    if not isinstance(html_content, str):
-        return str(html_content)
+    collector = CompanyCollector(cfg["company_regex"], MAX_COMPANIES_PER_ATS)
     try:
-        soup = BeautifulSoup(html_content, "html.parser")
-        return soup.get_text(separator=" ")[:5000].strip()
-    except Exception:
-        return str(html_content)[:5000]
+        children = collector.scan(iter_sitemap([resp.content]))
+    except Exception as e:
+        print(f"  - Could not parse sitemap: {sitemap_url} ({e})")
+        return set()
+
+    # Walk child sitemaps (and any nested indexes) in parallel until enough
+    # companies have been found.
+    seen = {sitemap_url}
+    while children and not collector.full:
+        children = [child for child in dict.fromkeys(children) if child not in seen]
+        seen.update(children)
+        with ThreadPoolExecutor(max_workers=ATS_WORKERS) as pool:
+            nested = pool.map(lambda url: collector.scan(stream_sitemap(url)), children)
+            children = [child for found in nested for child in found]
+
+    companies = collector.companies
+    if not seen - {sitemap_url}:
+        HTTP_CACHE.set_derived(sitemap_url, sorted(companies))
+    return companies
 
 
 def get_logo_url(company_name, source_domain):
@@ -145,82 +231,116 @@ def get_logo_url(company_name, source_domain):
     return f"https://logos.hunter.io/{source_domain}"
 
 
-def get_category(title):
-    title = (title or "").lower()
-    if any(x in title for x in ["developer", "engineer", "software", "react", "node", "python"]):
-        return "Development"
-    if any(x in title for x in ["design", "ui", "ux", "artist", "creative"]):
-        return "Design"
-    if any(x in title for x in ["marketing", "seo", "sales", "growth"]):
-        return "Marketing"
-    return "Other"
-
-
 def is_remote_anywhere(title, location, description):
-    text = f"{title} {location} {description}".lower()
-
-    restricted_phrases = [
-        "us only", "usa only", "united states only", "united kingdom only", "uk only", "eu only",
-        "europe only", "emea only", "apac only", "canada only", "australia only", "new zealand only",
-        "india only", "philippines only", "latin america only", "latam only", "north america only",
-        "south america only", "africa only", "middle east only", "remote - us", "remote (us)",
-        "remote - uk", "remote - eu", "remote - canada", "remote - europe", "remote - emea",
-        "must be located in", "must reside in", "must live in", "eligible to work in",
-        "work authorization", "work authorisation", "citizen only",
-    ]
+    return REMOTE_ANYWHERE.classify(title, location, description).remote
 
-    if any(phrase in text for phrase in restricted_phrases):
-        return False
 
-    positive_keywords = [
-        "remote anywhere", "work from anywhere", "worldwide", "global", "anywhere", "distributed",
-        "remote (global)", "remote - global", "remote - worldwide",
-    ]
-
-    explicit = any(k in text for k in positive_keywords)
-    if explicit:
-        return True
-
-    remote_flag = "remote" in text or "work from home" in text or "distributed" in text
-    location_clean = (location or "").strip().lower()
-    location_empty = location_clean == "" or location_clean in ["remote", "worldwide", "global", "anywhere"]
-
-    if remote_flag and location_empty:
-        return True
-
-    return False
+# A dry run's rows aren't stored, so it mustn't persist them as known either
+KNOWN_IDS = KnownIds(supabase, "jobs", cache_path=None if DRY_RUN else KNOWN_IDS_CACHE)
+# The same posting reposted on a job board (or under another ATS) has a new
+# external_id; this catches it by apply URL or near-identical content.
+NEAR_DUPS = NearDupIndex(None if DRY_RUN else NEAR_DUP_INDEX_PATH)
+NEAR_DUP_SKIPS = []
 
 
 def already_exists(external_id):
-    try:
-        existing = supabase.table("jobs").select("external_id").eq("external_id", external_id).execute()
-        return bool(existing.data)
-    except Exception:
-        return False
-
+    return external_id in KNOWN_IDS
 
-def save_job(job_data):
-    try:
-        supabase.table("jobs").insert(job_data).execute()
-        return True
-    except Exception as e:
-        print(f"  - Database error: {e}")
-        return False
-
-# --- 4. ATS FETCHERS ---
-
-def fetch_greenhouse_jobs(company):
-    url = ATS_CONFIG["greenhouse"]["jobs_api"].format(company=company)
-    resp, code = fetch(url)
-    if not resp:
-        return []
-    try:
-        data = resp.json()
-    except Exception:
-        return []
 
+def board_key(ats_key, company):
+    # HTTP cache key of a company's jobs API, as AtsSource.fetch requests it
+    cfg = ATS_CONFIG[ats_key]
+    return cache_key(cfg["jobs_api"].format(company=company), cfg.get("jobs_params"))
+
+
+# external_id -> fingerprint of rows sent to a writer, recorded once written
+PENDING_FINGERPRINTS = {}
+# Refreshed when a stored posting is edited at the source; status, category
+# and anything else set during vetting are left alone
+UPDATED_FIELDS = ("title", "description", "apply_url", "source_url")
+
+
+def job_written(row):
+    KNOWN_IDS.add(row["external_id"])
+    fingerprint = PENDING_FINGERPRINTS.pop(row["external_id"], None)
+    if fingerprint:
+        record_handled(row["external_id"], fingerprint)
+
+
+def job_failed(row, error):
+    print(f"  - Database error for {row['external_id']}: {error}")
+    PENDING_FINGERPRINTS.pop(row["external_id"], None)
+    NEAR_DUPS.discard(row["external_id"])
+    # Drop the board's validators so the next run gets a full response and
+    # retries the row instead of stopping at a 304
+    ats_key, company, _ = row["external_id"].split(":", 2)
+    HTTP_CACHE.forget(board_key(ats_key, company))
+
+
+def job_writer():
+    return BatchWriter(
+        dry_run if DRY_RUN else supabase_upsert(supabase, "jobs", on_conflict="external_id"),
+        batch_size=WRITE_BATCH_SIZE,
+        flush_interval=WRITE_FLUSH_SECONDS,
+        on_saved=job_written,
+        on_skipped=job_written,
+        on_failed=job_failed,
+        background=True,
+    )
+
+
+def update_writer():
+    # A posting deleted since it was stored comes back as skipped
+    return BatchWriter(
+        dry_run if DRY_RUN else supabase_update(supabase, "jobs", key="external_id"),
+        batch_size=WRITE_BATCH_SIZE,
+        flush_interval=WRITE_FLUSH_SECONDS,
+        on_saved=job_written,
+        on_skipped=job_written,
+        on_failed=job_failed,
+        background=True,
+    )
+
+
+# A replay reprocesses every archived job, so it starts from no fingerprints
+FINGERPRINTS = BoardFingerprints(None if REPLAY else FINGERPRINTS_PATH)
+CLOSED_IDS = []
+
+
+def changed_jobs(ats_key, company, raw_jobs, get_id):
+    # Diff the raw listing against the recorded fingerprints so clean_html and
+    # the filters only run on postings that are new or edited. Only the first
+    # MAX_JOBS_PER_COMPANY are considered; the rest aren't recorded, so they
+    # come up again if they move within the cap. Yields (raw, state) where
+    # `state` carries what save_company_jobs needs to record the job.
+    by_id = {}
+    for raw in raw_jobs:
+        by_id[str(get_id(raw))] = raw
+    hashes = {i: item_hash(raw) for i, raw in by_id.items()}
+    # Closures are judged on the full listing, not just the capped part
+    diff = FINGERPRINTS.diff(f"{ats_key}:{company}", hashes)
+    closed = [f"{ats_key}:{company}:{i}" for i in diff.closed]
+    CLOSED_IDS.extend(closed)
+    for external_id in closed:
+        NEAR_DUPS.discard(external_id)  # a closed posting shouldn't hide its reposts
+    changed = set(diff.changed)
+    wanted = set(diff.new) | changed
+    for i in list(by_id)[:MAX_JOBS_PER_COMPANY]:
+        if i in wanted:
+            yield by_id[i], {"fingerprint": hashes[i], "changed": i in changed}
+
+
+def record_handled(external_id, fingerprint):
+    # The job's row is written, updated or deliberately filtered out: don't
+    # process this version of it again
+    ats_key, company, job_id = external_id.split(":", 2)
+    FINGERPRINTS.record(f"{ats_key}:{company}", job_id, fingerprint)
+
+# --- 4. ATS NORMALIZERS ---
+
+def normalize_greenhouse_jobs(company, data):
     jobs = []
-    for job in data.get("jobs", []):
+    for job, state in changed_jobs("greenhouse", company, data.get("jobs", []), lambda j: j.get("id")):
         title = job.get("title")
         location = (job.get("location") or {}).get("name", "")
         description = job.get("content") or ""
@@ -237,23 +357,15 @@ def fetch_greenhouse_jobs(company):
             "source_url": apply_url,
             "source": "Greenhouse",
             "logo": get_logo_url(company, ATS_CONFIG["greenhouse"]["source_domain"]),
+            **state,
         })
 
     return jobs
 
 
-def fetch_lever_jobs(company):
-    url = ATS_CONFIG["lever"]["jobs_api"].format(company=company)
-    resp, code = fetch(url)
-    if not resp:
-        return []
-    try:
-        data = resp.json()
-    except Exception:
-        return []
-
+def normalize_lever_jobs(company, data):
     jobs = []
-    for job in data:
+    for job, state in changed_jobs("lever", company, data, lambda j: j.get("id")):
         title = job.get("text")
         categories = job.get("categories", {})
         location = categories.get("location", "")
@@ -271,22 +383,13 @@ def fetch_lever_jobs(company):
             "source_url": apply_url,
             "source": "Lever",
             "logo": get_logo_url(company, ATS_CONFIG["lever"]["source_domain"]),
+            **state,
         })
 
     return jobs
 
 
-def fetch_workable_jobs(company):
-    url = ATS_CONFIG["workable"]["jobs_api"].format(company=company)
-    resp, code = fetch(url, params={"state": "published"})
-    if not resp:
-        return []
-
-    try:
-        data = resp.json()
-    except Exception:
-        return []
-
+def normalize_workable_jobs(company, data):
     jobs_raw = []
     if isinstance(data, dict):
         if "results" in data:
@@ -300,7 +403,8 @@ def fetch_workable_jobs(company):
         jobs_raw = data
 
     jobs = []
-    for job in jobs_raw:
+    raw_id = lambda j: j.get("id") or j.get("shortcode")
+    for job, state in changed_jobs("workable", company, jobs_raw, raw_id):
         title = job.get("title")
         loc = job.get("location")
         if isinstance(loc, dict):
@@ -322,52 +426,83 @@ def fetch_workable_jobs(company):
             "source_url": apply_url,
             "source": "Workable",
             "logo": get_logo_url(company, ATS_CONFIG["workable"]["source_domain"]),
+            **state,
         })
 
     return jobs
 
-# --- 5. MAIN ---
-
-def process_ats(ats_key):
-    cfg = ATS_CONFIG[ats_key]
-    print(f"\n=== {cfg['name']} ===")
-
-    companies = discover_companies_from_sitemap(ats_key)
-    if not companies:
-        print(f"No companies discovered for {cfg['name']}.")
-        return 0
+ATS_NORMALIZERS = {
+    "greenhouse": normalize_greenhouse_jobs,
+    "lever": normalize_lever_jobs,
+    "workable": normalize_workable_jobs,
+}
 
-    print(f"Discovered {len(companies)} companies. Fetching jobs...")
 
-    total_saved = 0
-    for i, company in enumerate(sorted(companies)):
-        if i >= MAX_COMPANIES_PER_ATS:
-            break
+class AtsSource(Source):
+    # discover: companies from the sitemap; fetch: one company's jobs API;
+    # normalize: the provider's payload into job rows.
+    workers = ATS_WORKERS
+    timeout = SOURCE_TIMEOUT
 
-        if ats_key == "greenhouse":
-            jobs = fetch_greenhouse_jobs(company)
-        elif ats_key == "lever":
-            jobs = fetch_lever_jobs(company)
-        else:
-            jobs = fetch_workable_jobs(company)
+    def __init__(self, ats_key):
+        self.key = ats_key
+        self.cfg = ATS_CONFIG[ats_key]
+        self.name = self.cfg["name"]
 
-        if not jobs:
-            time.sleep(SLEEP_BETWEEN_REQUESTS)
-            continue
+    def discover(self):
+        with METRICS.timer("sitemap", source=self.name):
+            companies = discover_companies_from_sitemap(self.key)
+        if not companies:
+            print(f"No companies discovered for {self.name}.")
+            return []
 
-        for job in jobs[:MAX_JOBS_PER_COMPANY]:
-            if not job.get("apply_url"):
-                continue
+        selected = sorted(companies)[:MAX_COMPANIES_PER_ATS]
+        print(f"Discovered {len(companies)} {self.name} companies. Fetching jobs with {ATS_WORKERS} workers...")
+
+        with METRICS.timer("known_ids_prefetch", source=self.name):
+            known = KNOWN_IDS.prefetch(f"{self.key}:")
+        print(f"Loaded {known} known {self.name} job ids.")
+        return selected
+
+    def fetch(self, company):
+        url = self.cfg["jobs_api"].format(company=company)
+        resp, code = fetch(url, params=self.cfg.get("jobs_params"), skip_unchanged=True)
+        if not resp:
+            return None
+        try:
+            return resp.json()
+        except Exception:
+            return None
+
+    def normalize(self, company, data):
+        if data is None:
+            return []
+        return ATS_NORMALIZERS[self.key](company, data)
 
-            if not is_remote_anywhere(job.get("title"), job.get("location"), job.get("description")):
-                continue
 
-            external_id = job.get("external_id")
-            if already_exists(external_id):
-                continue
+# --- 5. MAIN ---
 
+def save_company_jobs(jobs, source, writer, updater):
+    listed = len(jobs)
+    with METRICS.timer("remote_filter", source=source):
+        verdicts = REMOTE_ANYWHERE.classify_many(jobs)
+    candidates = []
+    for job, verdict in zip(jobs, verdicts):
+        if job.get("apply_url") and verdict.remote:
+            candidates.append(job)
+        else:
+            record_handled(job["external_id"], job["fingerprint"])
+    # No-op when the provider's prefix was prefetched; otherwise one chunked
+    # `in_` query per company instead of one query per job.
+    with METRICS.timer("known_ids", source=source):
+        KNOWN_IDS.check_many(job.get("external_id") for job in candidates)
+
+    queued = known = updated = duplicates = 0
+    with METRICS.accumulate("near_dup", source) as near_dup:
+        for job in candidates:
+            external_id = job["external_id"]
             job_data = {
-                "external_id": str(external_id),
+                "external_id": external_id,
                 "title": str(job.get("title") or ""),
                 "company": str(job.get("company") or "Unknown"),
                 "location": "Remote",
@@ -382,24 +517,69 @@ def process_ats(ats_key):
                 "post_to_site": False,
             }
 
-            if save_job(job_data):
-                total_saved += 1
+            if already_exists(external_id):
+                if job["changed"]:
+                    PENDING_FINGERPRINTS[external_id] = job["fingerprint"]
+                    updater.add({f: job_data[f] for f in ("external_id",) + UPDATED_FIELDS})
+                    updated += 1
+                else:
+                    record_handled(external_id, job["fingerprint"])
+                    known += 1
+                continue
 
-        time.sleep(SLEEP_BETWEEN_REQUESTS)
+            with near_dup:
+                duplicate = NEAR_DUPS.check_and_add(external_id, job_data)
+            if duplicate:
+                NEAR_DUP_SKIPS.append(external_id)
+                record_handled(external_id, job["fingerprint"])
+                duplicates += 1
+                continue
+
+            PENDING_FINGERPRINTS[external_id] = job["fingerprint"]
+            writer.add(job_data)
+            queued += 1
 
-    print(f"Saved {total_saved} jobs for {cfg['name']}.")
-    return total_saved
+    METRICS.jobs(source, filtered=listed - len(candidates), known=known, updated=updated,
+                 duplicate=duplicates, queued=queued)
+    return queued
 
 
 def main():
     print("\nATS Directory Scraper (Remote Anywhere)\n")
-    total = 0
-
-    # Only the requested subset: Greenhouse, Lever, Workable
-    for ats_key in ["greenhouse", "lever", "workable"]:
-        total += process_ats(ats_key)
 
-    print(f"\nDone. Total new jobs saved: {total}\n")
+    # Only the requested subset: Greenhouse, Lever, Workable.
+    # Providers live on different hosts, so they run side by side; every
+    # company's jobs go through one filter + dedup + write stage on this thread.
+    sources = [AtsSource(key) for key in ["greenhouse", "lever", "workable"]]
+    NEAR_DUPS.seed(supabase, "jobs")
+    with job_writer() as writer, update_writer() as updater:
+        reports = run_sources(sources, lambda jobs, source: save_company_jobs(jobs, source, writer, updater))
+
+    for report in reports:
+        print(report.summary())
+
+    if CLOSED_IDS:
+        print(f"{len(CLOSED_IDS)} postings closed since the last run.")
+        append_closed_events(CLOSED_EVENTS_PATH, CLOSED_IDS)
+
+    if NEAR_DUP_SKIPS:
+        print(f"{len(NEAR_DUP_SKIPS)} jobs skipped as duplicates of stored postings.")
+
+    KNOWN_IDS.save()
+    NEAR_DUPS.save()
+    # A provider that timed out or crashed may have dropped rows whose
+    # validators and fingerprints were already recorded; keep last run's so
+    # they're fetched again.
+    if all(not r.timed_out and not r.failed for r in reports):
+        HTTP_CACHE.save()
+        FINGERPRINTS.save()
+    else:
+        print("Not saving HTTP cache or fingerprints: a provider did not finish.")
+
+    print(f"\nDone. Total new jobs saved: {writer.saved} ({writer.skipped} already stored, {writer.failed} failed)")
+    print(f"Edited postings updated: {updater.saved} ({updater.failed} failed)\n")
+    print(METRICS.summary())
+    METRICS.export_from_env()
 
 
 if __name__ == "__main__":
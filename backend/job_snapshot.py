@@ -0,0 +1,353 @@
+"""
+Compact, memory-mapped snapshot of the job list.
+
+``write_snapshot`` turns the job list into a single file the API can ``mmap``
+instead of parsing and holding the whole JSON array as Python objects:
+
+- every job minus its description as a pre-serialized JSON row, with the
+  description stored out-of-line as a JSON string literal so it is only
+  read when a response includes it;
+- sorted integer ids for ``/jobs/{id}`` lookups;
+- the per-field filter indexes and the datePosted order;
+- the BM25 index, with postings both in position order (for scoring a
+  document) and in descending score-contribution order (for top-k).
+
+All arrays are little-endian and 8-byte aligned; a JSON header records where
+each one lives. ``MappedSnapshot`` reads the file in place and offers the
+same interface as ``job_store.Snapshot``.
+
+Convert an existing jobs file with:
+
+    python job_snapshot.py remote_jobs.json remote_jobs.jobsnap
+"""
+
+import hashlib
+import heapq
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from search_index import SearchIndex, tokenize
+
+MAGIC = b"RJBSNAP1"
+ALIGN = 8
+
+FILTER_FIELDS = ("category", "source", "company")
+
+
+def _dumps(value) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def is_snapshot(path: str) -> bool:
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def write_snapshot(jobs: Sequence[dict], path: str) -> None:
+    """Write `jobs` to `path` atomically (temp file + rename)."""
+    # job_store imports this module, so import lazily
+    from job_store import parse_timestamp
+
+    n = len(jobs)
+    sections: Dict[str, Tuple[bytes, str]] = {}
+
+    row_offsets, rows = array("Q", [0]), []
+    desc_offsets, descs = array("Q", [0]), []
+    for job in jobs:
+        summary = {k: v for k, v in job.items() if k != "description"}
+        row = _dumps(summary)
+        rows.append(row)
+        row_offsets.append(row_offsets[-1] + len(row))
+        # Empty means "no description key"; an empty description is b'""'
+        desc = _dumps(job["description"]) if "description" in job else b""
+        descs.append(desc)
+        desc_offsets.append(desc_offsets[-1] + len(desc))
+    sections["row_offsets"] = (row_offsets.tobytes(), "Q")
+    sections["rows"] = (b"".join(rows), "B")
+    sections["desc_offsets"] = (desc_offsets.tobytes(), "Q")
+    sections["descs"] = (b"".join(descs), "B")
+
+    try:
+        by_id = sorted((int(job["id"]), pos) for pos, job in enumerate(jobs))
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("every job needs an integer id")
+    sections["ids"] = (array("q", [i for i, _ in by_id]).tobytes(), "q")
+    sections["id_pos"] = (array("I", [p for _, p in by_id]).tobytes(), "I")
+
+    fields: Dict[str, Dict[str, List[int]]] = {}
+    for field in FILTER_FIELDS:
+        groups: Dict[str, List[int]] = {}
+        for pos, job in enumerate(jobs):
+            value = job.get(field)
+            if value is not None:
+                groups.setdefault(str(value).strip().lower(), []).append(pos)
+        positions, ranges = array("I"), {}
+        for value, members in groups.items():
+            ranges[value] = [len(positions), len(positions) + len(members)]
+            positions.extend(members)
+        fields[field] = ranges
+        sections[f"field:{field}"] = (positions.tobytes(), "I")
+
+    posted = []
+    for pos, job in enumerate(jobs):
+        ts = parse_timestamp(job.get("datePosted"))
+        if ts is not None:
+            posted.append((ts.timestamp(), pos))
+    posted.sort()
+    sections["posted_ts"] = (array("d", [t for t, _ in posted]).tobytes(), "d")
+    sections["posted_pos"] = (array("I", [p for _, p in posted]).tobytes(), "I")
+
+    # BM25: reuse the in-memory index for tokenization and scoring, then
+    # lay its postings out as flat arrays.
+    index = SearchIndex()
+    index.update(jobs)
+    position = {str(job.get("id")): pos for pos, job in enumerate(jobs)}
+    norms = array("d", [0.0] * n)
+    for doc_id, norm in index._norms.items():
+        norms[position[doc_id]] = norm
+    terms = sorted(index.postings)
+    term_offsets, term_bytes = array("Q", [0]), []
+    post_offsets = array("Q", [0])
+    boosts = array("d")
+    post_pos, post_tf = array("I"), array("I")
+    imp_score, imp_pos = array("d"), array("I")
+    for term in terms:
+        encoded = term.encode("utf-8")
+        term_bytes.append(encoded)
+        term_offsets.append(term_offsets[-1] + len(encoded))
+        boost, ranked = index._term(term)
+        boosts.append(boost)
+        by_pos = sorted((position[d], tf) for d, tf in index.postings[term].items())
+        post_pos.extend(p for p, _ in by_pos)
+        post_tf.extend(tf for _, tf in by_pos)
+        imp_score.extend(score for score, _ in ranked)
+        imp_pos.extend(position[d] for _, d in ranked)
+        post_offsets.append(len(post_pos))
+    sections["norms"] = (norms.tobytes(), "d")
+    sections["term_offsets"] = (term_offsets.tobytes(), "Q")
+    sections["terms"] = (b"".join(term_bytes), "B")
+    sections["post_offsets"] = (post_offsets.tobytes(), "Q")
+    sections["boosts"] = (boosts.tobytes(), "d")
+    sections["post_pos"] = (post_pos.tobytes(), "I")
+    sections["post_tf"] = (post_tf.tobytes(), "I")
+    sections["imp_score"] = (imp_score.tobytes(), "d")
+    sections["imp_pos"] = (imp_pos.tobytes(), "I")
+
+    # Header first (its size fixes where the data starts), then the sections
+    layout: Dict[str, List] = {}
+    offset = 0
+    for name, (data, fmt) in sections.items():
+        layout[name] = [offset, len(data), fmt]
+        offset += len(data) + (-len(data) % ALIGN)
+    header = _dumps({"count": n, "fields": fields, "sections": layout})
+    data_start = len(MAGIC) + 8 + len(header)
+    data_start += -data_start % ALIGN
+
+    if sys.byteorder != "little":
+        raise RuntimeError("snapshots are written little-endian")
+
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", data_start))
+        f.write(header)
+        f.write(b"\0" * (data_start - len(MAGIC) - 8 - len(header)))
+        for data, _ in sections.values():
+            f.write(data)
+            f.write(b"\0" * (-len(data) % ALIGN))
+    os.replace(tmp, path)
+
+
+class MappedSnapshot:
+    """A snapshot file read in place. Never mutated once built."""
+
+    def __init__(self, path: str, modified: float):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        mm = self._mm
+        if mm[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a job snapshot")
+        (data_start,) = struct.unpack_from("<Q", mm, len(MAGIC))
+        header = json.loads(mm[len(MAGIC) + 8:data_start].rstrip(b"\0"))
+
+        view = memoryview(mm)
+        self._s = {}
+        for name, (offset, length, fmt) in header["sections"].items():
+            section = view[data_start + offset:data_start + offset + length]
+            self._s[name] = section if fmt == "B" else section.cast(fmt)
+        self.count: int = header["count"]
+        self.fields: Dict[str, Dict[str, List[int]]] = header["fields"]
+
+        # Content digest: identical files give identical ETags on every worker
+        self.version = hashlib.blake2b(mm, digest_size=12).hexdigest()
+        self.modified = modified
+
+    # --- rows ---
+
+    def _row(self, pos: int) -> bytes:
+        offsets = self._s["row_offsets"]
+        return self._s["rows"][offsets[pos]:offsets[pos + 1]].tobytes()
+
+    def _desc(self, pos: int) -> bytes:
+        offsets = self._s["desc_offsets"]
+        return self._s["descs"][offsets[pos]:offsets[pos + 1]].tobytes()
+
+    def _full_row(self, pos: int) -> bytes:
+        row, desc = self._row(pos), self._desc(pos)
+        if not desc:
+            return row
+        if row == b"{}":
+            return b'{"description":' + desc + b"}"
+        return row[:-1] + b',"description":' + desc + b"}"
+
+    def iter_body(self, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        """The full job array in chunks of about `chunk_size` bytes, read from the map."""
+        chunk, size = [b"["], 1
+        for pos in range(self.count):
+            row = self._full_row(pos) if not pos else b"," + self._full_row(pos)
+            chunk.append(row)
+            size += len(row)
+            if size >= chunk_size:
+                yield b"".join(chunk)
+                chunk, size = [], 0
+        chunk.append(b"]")
+        yield b"".join(chunk)
+
+    def locate(self, job_id) -> Optional[int]:
+        """Current position of a job, or None if it is gone."""
+        try:
+            job_id = int(job_id)
+        except (TypeError, ValueError):
+            return None
+        ids = self._s["ids"]
+        i = bisect_left(ids, job_id)
+        if i == len(ids) or ids[i] != job_id:
+            return None
+        return self._s["id_pos"][i]
+
+    def id_at(self, pos: int) -> str:
+        return str(json.loads(self._row(pos)).get("id"))
+
+    def get(self, job_id) -> Optional[dict]:
+        pos = self.locate(job_id)
+        return None if pos is None else json.loads(self._full_row(pos))
+
+    def filter(self, filters: Dict[str, Optional[str]], posted_since: Optional[datetime] = None) -> List[int]:
+        """Positions (in file order) of jobs matching every given filter."""
+        candidates: List[set] = []
+        for field, value in filters.items():
+            if value is None:
+                continue
+            start, end = self.fields.get(field, {}).get(value.strip().lower(), (0, 0))
+            candidates.append(set(self._s[f"field:{field}"][start:end]) if end else set())
+        if posted_since is not None:
+            start = bisect_left(self._s["posted_ts"], posted_since.timestamp())
+            candidates.append(set(self._s["posted_pos"][start:]))
+
+        if not candidates:
+            return list(range(self.count))
+        candidates.sort(key=len)
+        matched = candidates[0].intersection(*candidates[1:])
+        return sorted(matched)
+
+    def render(self, positions: Iterable[int], fields: Optional[Sequence[str]] = None) -> bytes:
+        """JSON array of the given jobs, optionally projected to `fields`."""
+        if not fields:
+            return b"[" + b",".join(self._full_row(pos) for pos in positions) + b"]"
+        with_desc = "description" in fields
+        out = []
+        for pos in positions:
+            job = json.loads(self._row(pos))
+            if with_desc:
+                desc = self._desc(pos)
+                if desc:
+                    job["description"] = json.loads(desc)
+            out.append({f: job[f] for f in fields if f in job})
+        return _dumps(out)
+
+    # --- search ---
+
+    def _term(self, token: str) -> int:
+        """Index of `token` in the sorted term table, or -1."""
+        key = token.encode("utf-8")
+        offsets, terms = self._s["term_offsets"], self._s["terms"]
+        lo, hi = 0, len(offsets) - 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if terms[offsets[mid]:offsets[mid + 1]].tobytes() < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(offsets) - 1 and terms[offsets[lo]:offsets[lo + 1]].tobytes() == key:
+            return lo
+        return -1
+
+    def search_top(self, query: str, k: int, allowed: Optional[set] = None) -> List[int]:
+        """
+        Positions of the `k` best BM25 matches, best first; ties go to the
+        earlier job (same threshold algorithm and order as SearchIndex.top
+        with a position order, over the mapped postings).
+        """
+        s = self._s
+        post_offsets, boosts = s["post_offsets"], s["boosts"]
+        post_pos, post_tf = s["post_pos"], s["post_tf"]
+        imp_score, imp_pos, norms = s["imp_score"], s["imp_pos"], s["norms"]
+
+        terms = []
+        for token in sorted(set(tokenize(query))):
+            t = self._term(token)
+            if t >= 0:
+                terms.append((post_offsets[t], post_offsets[t + 1], boosts[t]))
+        if not terms or k <= 0:
+            return []
+
+        heap: List[Tuple[float, int]] = []
+        seen = set()
+        depth = 0
+        while True:
+            threshold = 0.0
+            advanced = False
+            for start, end, _ in terms:
+                if start + depth >= end:
+                    continue
+                advanced = True
+                threshold += imp_score[start + depth]
+                pos = imp_pos[start + depth]
+                if pos in seen:
+                    continue
+                seen.add(pos)
+                if allowed is not None and pos not in allowed:
+                    continue
+                score = 0.0
+                for t_start, t_end, boost in terms:
+                    i = bisect_left(post_pos, pos, t_start, t_end)
+                    if i < t_end and post_pos[i] == pos:
+                        tf = post_tf[i]
+                        score += boost * tf / (tf + norms[pos])
+                if len(heap) < k:
+                    heapq.heappush(heap, (score, -pos))
+                elif (score, -pos) > heap[0]:
+                    heapq.heapreplace(heap, (score, -pos))
+            depth += 1
+            # No unseen document can beat, or tie with, the current k-th best
+            if not advanced or (len(heap) == k and heap[0][0] > threshold):
+                break
+
+        return [-neg for _, neg in sorted(heap, reverse=True)]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("usage: python job_snapshot.py <jobs.json> <out.jobsnap>")
+        sys.exit(2)
+    with open(sys.argv[1], "rb") as f:
+        source = json.load(f)
+    write_snapshot(source, sys.argv[2])
+    print(f"✅ Wrote {len(source)} jobs to {sys.argv[2]}")
@@ -0,0 +1,164 @@
+"""
+In-memory view of remote_jobs.json for the job API.
+
+Each version of the file is parsed once into an immutable ``Snapshot``: an
+id-keyed index, per-field filter indexes, a BM25 search index and
+pre-serialized JSON rows. If the file is a snapshot written by
+``job_snapshot.write_snapshot`` it is memory-mapped instead
+(``MappedSnapshot``), which keeps almost nothing resident and reads
+descriptions only for responses that include them. ``JobStore.watch`` polls
+the file's mtime in the background, builds the next snapshot off the event
+loop and swaps it in with a single attribute assignment, so request handlers
+just read ``store.snapshot`` -- no file I/O, no locks.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+from bisect import bisect_left
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from job_snapshot import MappedSnapshot, is_snapshot
+from search_index import SearchIndex
+
+# Fields with an exact-match (case-insensitive) filter index
+FILTER_FIELDS = ("category", "source", "company")
+
+
+def dumps(value) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def parse_timestamp(value) -> Optional[datetime]:
+    """Parse an ISO date/datetime; naive values are taken as UTC."""
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+class Snapshot:
+    """One fully indexed version of the jobs file. Never mutated once built."""
+
+    def __init__(self, raw: bytes, modified: float, previous: Optional["Snapshot"] = None):
+        jobs = json.loads(raw)
+
+        field_index: Dict[str, Dict[str, List[int]]] = {field: {} for field in FILTER_FIELDS}
+        posted = []
+        for pos, job in enumerate(jobs):
+            for field in FILTER_FIELDS:
+                value = job.get(field)
+                if value is not None:
+                    field_index[field].setdefault(str(value).strip().lower(), []).append(pos)
+            ts = parse_timestamp(job.get("datePosted"))
+            if ts is not None:
+                posted.append((ts, pos))
+        posted.sort()
+
+        self.jobs: List[dict] = jobs
+        self.by_id: Dict[str, dict] = {str(job.get("id")): job for job in jobs}
+        self.position: Dict[str, int] = {str(job.get("id")): pos for pos, job in enumerate(jobs)}
+        self.rows: List[bytes] = [dumps(job) for job in jobs]
+        self.body: bytes = b"[" + b",".join(self.rows) + b"]"
+        self.field_index = field_index
+        self.posted: List[Tuple[datetime, int]] = posted
+        # Content digest: identical files give identical ETags on every worker
+        self.version = hashlib.blake2b(raw, digest_size=12).hexdigest()
+        self.modified = modified
+
+        # Only jobs whose text changed since the previous snapshot are
+        # re-tokenized; the copy leaves the previous index untouched.
+        self.search = previous.search.copy() if previous is not None else SearchIndex()
+        self.search.update(jobs)
+
+    def get(self, job_id) -> Optional[dict]:
+        return self.by_id.get(str(job_id))
+
+    def locate(self, job_id) -> Optional[int]:
+        """Current position of a job, or None if it is gone."""
+        return self.position.get(str(job_id))
+
+    def id_at(self, pos: int) -> str:
+        return str(self.jobs[pos].get("id"))
+
+    def filter(self, filters: Dict[str, Optional[str]], posted_since: Optional[datetime] = None) -> List[int]:
+        """Positions (in file order) of jobs matching every given filter."""
+        candidates: List[set] = []
+        for field, value in filters.items():
+            if value is None:
+                continue
+            candidates.append(set(self.field_index.get(field, {}).get(value.strip().lower(), ())))
+        if posted_since is not None:
+            start = bisect_left(self.posted, (posted_since, -1))
+            candidates.append({pos for _, pos in self.posted[start:]})
+
+        if not candidates:
+            return list(range(len(self.jobs)))
+        candidates.sort(key=len)
+        matched = candidates[0].intersection(*candidates[1:])
+        return sorted(matched)
+
+    def render(self, positions: Iterable[int], fields: Optional[Sequence[str]] = None) -> bytes:
+        """JSON array of the given jobs, optionally projected to `fields`."""
+        if not fields:
+            return b"[" + b",".join(self.rows[pos] for pos in positions) + b"]"
+        return dumps([{f: self.jobs[pos].get(f) for f in fields if f in self.jobs[pos]} for pos in positions])
+
+    def search_top(self, query: str, k: int, allowed: Optional[set] = None) -> List[int]:
+        """Positions of the `k` best BM25 matches, best first; ties go to the earlier job."""
+        allowed_ids = None
+        if allowed is not None:
+            allowed_ids = {str(self.jobs[pos].get("id")) for pos in allowed}
+        return [self.position[doc_id] for doc_id, _ in self.search.top(query, k, allowed_ids, self.position)]
+
+
+class JobStore:
+    def __init__(self, path: str, check_interval: float = 1.0):
+        self.path = path
+        self.check_interval = check_interval
+        # None until the first successful load, or while the file is missing
+        self.snapshot: Optional[Union[Snapshot, MappedSnapshot]] = None
+        self._mtime: Optional[int] = None
+
+    def invalidate(self) -> None:
+        """Force a reload on the next check (e.g. from a SIGHUP handler)."""
+        self._mtime = None
+
+    def refresh(self) -> bool:
+        """
+        Blocking: reload if the file changed and swap in the new snapshot.
+        Returns False if the file doesn't exist. A file that fails to parse
+        leaves the current snapshot in place and is retried on the next call.
+        """
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            self.snapshot = None
+            self._mtime = None
+            return False
+        if mtime != self._mtime:
+            if is_snapshot(self.path):
+                self.snapshot = MappedSnapshot(self.path, mtime / 1e9)
+            else:
+                with open(self.path, "rb") as f:
+                    raw = f.read()
+                previous = self.snapshot if isinstance(self.snapshot, Snapshot) else None
+                self.snapshot = Snapshot(raw, mtime / 1e9, previous)
+            self._mtime = mtime
+        return True
+
+    async def watch(self) -> None:
+        """Poll for changes every `check_interval` seconds, off the event loop."""
+        while True:
+            try:
+                await asyncio.to_thread(self.refresh)
+            except Exception as e:
+                print(f"⚠️ Could not reload {self.path}: {e}")
+            await asyncio.sleep(self.check_interval)
@@ -1,9 +1,45 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-import json
+from fastapi.responses import JSONResponse
+from bisect import bisect_right
+from contextlib import asynccontextmanager
+from typing import Optional, Tuple
+from urllib.parse import urlencode
+import asyncio
+import base64
 import os
+import signal
 
-app = FastAPI()
+from job_snapshot import MappedSnapshot
+from job_store import JobStore, dumps, parse_timestamp
+from responses import ResponseCache, stream
+
+# Parsed once and re-read in the background when the file's mtime changes or
+# on SIGHUP; handlers only ever read the current immutable store.snapshot.
+# JOBS_FILE may point at a JSON array or a snapshot from job_snapshot.py.
+store = JobStore(os.environ.get("JOBS_FILE") or os.path.join(os.path.dirname(__file__), "remote_jobs.json"))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        await asyncio.to_thread(store.refresh)
+    except Exception as e:
+        print(f"⚠️ Could not load {store.path}: {e}")
+    watcher = asyncio.create_task(store.watch())
+    try:
+        yield
+    finally:
+        watcher.cancel()
+
+
+app = FastAPI(lifespan=lifespan)
+
+if hasattr(signal, "SIGHUP"):
+    try:
+        signal.signal(signal.SIGHUP, lambda *_: store.invalidate())
+    except ValueError:
+        pass  # not in the main thread (e.g. imported by a test runner)
 
 # Restrict CORS origins for production safety.
 def parse_cors_origins() -> list[str]:
@@ -20,38 +56,164 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count", "X-Next-Cursor", "X-Next-Offset", "ETag"],
 )
 
+MAX_PAGE_SIZE = 500
+
+# Serialized (and lazily gzip/brotli-compressed) bodies for the current
+# jobs-file version, keyed by path and normalized query string.
+responses = ResponseCache()
+
+
+def response_key(request: Request) -> str:
+    return request.url.path + "?" + urlencode(sorted(request.query_params.multi_items()))
+
+
+async def cached(request: Request, snap, key: str, build):
+    """Respond from the response cache; `build` and compression run off the event loop."""
+    body = await responses.get(snap.version, snap.modified, key, build)
+    return await body.respond(request)
+
+
+def encode_cursor(position: int, job_id: str) -> str:
+    return base64.urlsafe_b64encode(f"{position}:{job_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[int, Optional[str]]]:
+    """(position, job id) of the last job served; older cursors carry no id."""
+    try:
+        text = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        position, sep, job_id = text.partition(":")
+        return int(position), (job_id if sep else None)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def seek(snap, cursor: Tuple[int, Optional[str]]) -> int:
+    """Position of the cursor's job in `snap`, or its old position if it is gone."""
+    position, job_id = cursor
+    if job_id is not None:
+        current = snap.locate(job_id)
+        if current is not None:
+            return current
+    return position
+
 
 @app.get("/")
-def read_root():
+async def read_root():
     return {"message": "EchoJobs backend is running"}
 
 
 @app.get("/jobs")
-def get_jobs():
-    file_path = os.path.join(os.path.dirname(__file__), "remote_jobs.json")
+async def get_jobs(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
+    category: Optional[str] = None,
+    source: Optional[str] = None,
+    company: Optional[str] = None,
+    posted_since: Optional[str] = None,
+    fields: Optional[str] = None,
+):
+    snap = store.snapshot
+    if snap is None:
+        return {"error": "Jobs file not found."}
 
-    if not os.path.exists(file_path):
+    # No parameters: the full, pre-serialized array as before. A mapped
+    # snapshot streams it from the map rather than caching a copy of the file.
+    if limit is None and not offset and cursor is None and category is None and source is None \
+            and company is None and posted_since is None and fields is None:
+        if isinstance(snap, MappedSnapshot):
+            return stream(request, snap.version, snap.modified, "/jobs", snap.iter_body)
+        return await cached(request, snap, "/jobs", lambda: (snap.body, {}))
+
+    since = None
+    if posted_since is not None:
+        since = parse_timestamp(posted_since)
+        if since is None:
+            return JSONResponse({"error": "Invalid posted_since date."}, status_code=400)
+
+    after = None
+    if cursor is not None:
+        after = decode_cursor(cursor)
+        if after is None:
+            return JSONResponse({"error": "Invalid cursor."}, status_code=400)
+
+    def build():
+        positions = snap.filter({"category": category, "source": source, "company": company}, since)
+        total = len(positions)
+
+        # Cursors name the last job of the previous page and the next page
+        # starts after wherever that job is now (file order), so jobs added
+        # or removed elsewhere in the file don't make pages skip or repeat
+        # rows. If that job itself was removed we fall back to its old
+        # position, and a file whose jobs were reordered can still shift
+        # pages: the order is the file's, not a sort on a stable key.
+        start = offset if after is None else bisect_right(positions, seek(snap, after)) + offset
+        end = total if limit is None else start + limit
+        page = positions[start:end]
+
+        headers = {"X-Total-Count": str(total)}
+        if page and end < total:
+            headers["X-Next-Cursor"] = encode_cursor(page[-1], snap.id_at(page[-1]))
+
+        projection = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+        return snap.render(page, projection), headers
+
+    return await cached(request, snap, response_key(request), build)
+
+
+@app.get("/jobs/search")
+async def search_jobs(
+    request: Request,
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    category: Optional[str] = None,
+    source: Optional[str] = None,
+    company: Optional[str] = None,
+    posted_since: Optional[str] = None,
+    fields: Optional[str] = None,
+):
+    snap = store.snapshot
+    if snap is None:
         return {"error": "Jobs file not found."}
 
-    with open(file_path, "r", encoding="utf-8") as file:
-        jobs = json.load(file)
-    return jobs
+    since = None
+    if posted_since is not None:
+        since = parse_timestamp(posted_since)
+        if since is None:
+            return JSONResponse({"error": "Invalid posted_since date."}, status_code=400)
 
+    def build():
+        allowed = None
+        if category is not None or source is not None or company is not None or since is not None:
+            allowed = set(snap.filter({"category": category, "source": source, "company": company}, since))
 
-@app.get("/jobs/{job_id}")
-def get_job_by_id(job_id: int):
-    file_path = os.path.join(os.path.dirname(__file__), "remote_jobs.json")
+        # Counting every match would cost more than ranking the top few, so
+        # fetch one extra hit just to tell whether there is a next page.
+        hits = snap.search_top(q, offset + limit + 1, allowed)
+        page = hits[offset:offset + limit]
 
-    if not os.path.exists(file_path):
-        return {"error": "Jobs file not found."}
+        headers = {}
+        if len(hits) > offset + limit:
+            headers["X-Next-Offset"] = str(offset + limit)
+
+        projection = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+        return snap.render(page, projection), headers
 
-    with open(file_path, "r", encoding="utf-8") as file:
-        jobs = json.load(file)
+    return await cached(request, snap, response_key(request), build)
 
-    for job in jobs:
-        if str(job.get("id")) == str(job_id):
-            return job
 
-    return {"error": "Job not found"}
+@app.get("/jobs/{job_id}")
+async def get_job_by_id(request: Request, job_id: int):
+    snap = store.snapshot
+    if snap is None:
+        return {"error": "Jobs file not found."}
+
+    job = snap.get(job_id)
+    if job is None:
+        return {"error": "Job not found"}
+    return await cached(request, snap, f"/jobs/{job_id}", lambda: (dumps(job), {}))
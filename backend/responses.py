@@ -0,0 +1,217 @@
+"""
+Cached, precompressed JSON responses with strong ETags.
+
+Each distinct response body is stored once per jobs-file version together
+with its gzip (and, if the ``brotli`` package is installed, brotli) encodings,
+which are produced the first time a client asks for them. Conditional
+requests (``If-None-Match`` / ``If-Modified-Since``) are answered with 304s.
+Building a body and compressing it are CPU-bound, so both run in a worker
+thread; the event loop only awaits them.
+
+Bodies too big to keep a second copy of (the full job array of a mapped
+snapshot) are streamed with ``stream`` instead: same ETags and 304s, gzip
+only, compressed chunk by chunk while the response is sent.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import os
+import zlib
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+# Bodies smaller than this aren't worth compressing
+MIN_COMPRESS_SIZE = 1024
+CACHE_SIZE = int(os.environ.get("JOBS_RESPONSE_CACHE_SIZE", "512"))
+CACHE_CONTROL = os.environ.get("JOBS_CACHE_CONTROL", "public, max-age=60")
+# Streamed bodies are compressed per request, so trade some ratio for speed
+STREAM_COMPRESS_LEVEL = 6
+
+
+def _compress(encoding: str, content: bytes) -> bytes:
+    if encoding == "br":
+        return brotli.compress(content, quality=9)
+    return gzip.compress(content, compresslevel=9, mtime=0)
+
+
+def pick_encoding(accept_encoding: str, supported: Optional[Sequence[str]] = None) -> Optional[str]:
+    """
+    Best coding allowed by an Accept-Encoding header, or None. `supported`
+    narrows the codings we are willing to produce.
+    """
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if coding:
+            accepted[coding.strip().lower()] = q
+
+    for coding in (("br", "gzip") if brotli else ("gzip",)):
+        if supported is not None and coding not in supported:
+            continue
+        q = accepted.get(coding, accepted.get("*", 0.0))
+        if q > 0:
+            return coding
+    return None
+
+
+def etag_for(version: str, key: str) -> str:
+    return f"{version}-{hashlib.blake2b(key.encode('utf-8'), digest_size=6).hexdigest()}"
+
+
+def _base_tag(tag: str) -> str:
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    tag = tag.strip('"')
+    for suffix in ("-gzip", "-br"):
+        if tag.endswith(suffix):
+            return tag[: -len(suffix)]
+    return tag
+
+
+def not_modified(request: Request, etag: str, modified: float) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [t.strip() for t in if_none_match.split(",")]
+        # Weak comparison, ignoring the per-encoding suffix
+        return "*" in tags or any(_base_tag(t) == etag for t in tags)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _headers(etag: str, modified: float, encoding: Optional[str]) -> Dict[str, str]:
+    # Strong ETags must differ between encodings of the same body
+    return {
+        "ETag": f'"{etag}-{encoding}"' if encoding else f'"{etag}"',
+        "Last-Modified": formatdate(modified, usegmt=True),
+        "Cache-Control": CACHE_CONTROL,
+        "Vary": "Accept-Encoding",
+    }
+
+
+def _gzip_chunks(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(STREAM_COMPRESS_LEVEL, zlib.DEFLATED, 31)  # 31: gzip framing
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream(
+    request: Request, version: str, modified: float, key: str, chunks: Callable[[], Iterator[bytes]]
+) -> Response:
+    """
+    Send the body `chunks()` produces without holding it in memory. It is a
+    plain iterator, so Starlette reads (and we compress) it in a worker thread.
+    """
+    encoding = pick_encoding(request.headers.get("accept-encoding", ""), ("gzip",))
+    etag = etag_for(version, key)
+    out = _headers(etag, modified, encoding)
+    if not_modified(request, etag, modified):
+        return Response(status_code=304, headers=out)
+    body = chunks()
+    if encoding:
+        out["Content-Encoding"] = encoding
+        body = _gzip_chunks(body)
+    return StreamingResponse(body, media_type="application/json", headers=out)
+
+
+class CachedBody:
+    def __init__(self, content: bytes, etag: str, modified: float, headers: Optional[Dict[str, str]] = None):
+        self.content = content
+        self.headers = headers or {}
+        self.etag = etag
+        self.modified = modified
+        self._encoded: Dict[str, bytes] = {}
+
+    def encoded(self, encoding: Optional[str]) -> bytes:
+        if encoding is None or len(self.content) < MIN_COMPRESS_SIZE:
+            return self.content
+        data = self._encoded.get(encoding)
+        if data is None:
+            data = self._encoded[encoding] = _compress(encoding, self.content)
+        return data
+
+    async def respond(self, request: Request) -> Response:
+        encoding = pick_encoding(request.headers.get("accept-encoding", ""))
+        if len(self.content) < MIN_COMPRESS_SIZE:
+            encoding = None
+
+        out = dict(self.headers)
+        out.update(_headers(self.etag, self.modified, encoding))
+
+        if not_modified(request, self.etag, self.modified):
+            return Response(status_code=304, headers=out)
+        if encoding:
+            out["Content-Encoding"] = encoding
+        content = self._encoded.get(encoding) if encoding else self.content
+        if content is None:
+            content = await asyncio.to_thread(self.encoded, encoding)
+        return Response(content=content, media_type="application/json", headers=out)
+
+
+class ResponseCache:
+    """
+    LRU of CachedBody by (version, key); a new version evicts the old.
+    Only used from the event loop thread, so it takes no locks; concurrent
+    misses for the same key share one build.
+    """
+
+    def __init__(self, maxsize: int = CACHE_SIZE):
+        self.maxsize = maxsize
+        self._items: "OrderedDict[str, CachedBody]" = OrderedDict()
+        self._building: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._version = None
+
+    async def get(
+        self, version: str, modified: float, key: str, build: Callable[[], Tuple[bytes, Dict[str, str]]]
+    ) -> CachedBody:
+        """
+        The cached body for `key`. On a miss `build` is called in a worker
+        thread for (content, headers).
+        """
+        if version != self._version:
+            self._items.clear()
+            self._version = version
+        body = self._items.get(key)
+        if body is not None:
+            self._items.move_to_end(key)
+            return body
+
+        task = self._building.get((version, key))
+        if task is None:
+            task = self._building[(version, key)] = asyncio.ensure_future(asyncio.to_thread(build))
+            task.add_done_callback(lambda _: self._building.pop((version, key), None))
+        # A cancelled request must not cancel the build other requests await
+        content, headers = await asyncio.shield(task)
+
+        body = self._items.get(key) if version == self._version else None
+        if body is None:
+            body = CachedBody(content, etag_for(version, key), modified, headers)
+            if version == self._version:
+                self._items[key] = body
+                if len(self._items) > self.maxsize:
+                    self._items.popitem(last=False)
+        return body
@@ -1,10 +1,22 @@
+import multiprocessing
 import os
-import feedparser
-import re
-from datetime import datetime
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from requests.adapters import HTTPAdapter
 from supabase import create_client, Client
 from dotenv import load_dotenv, find_dotenv
-from bs4 import BeautifulSoup 
+
+# Shared helpers live in <repo>/scraping
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scraping.archive import archive_from_env, dry_run_from_env
+from scraping.dedup import KnownIds
+from scraping.http_cache import ValidatorCache
+from scraping.http_client import PoliteSession
+from scraping.metrics import METRICS
+from scraping.near_dup import NearDupIndex
+from scraping.rss import RssSource
+from scraping.sources import run_sources
+from scraping.writer import BatchWriter, dry_run, supabase_upsert
 
 # --- 1. SETUP & AUTH ---
 # This automatically finds your .env file
@@ -34,109 +46,113 @@ RSS_FEEDS = [
     {"url": "https://remote.co/feed/", "source": "Remote.co", "domain": "remote.co"},
 ]
 
-# --- 3. HELPER FUNCTIONS ---
-
-def clean_html(html_content):
-    if not html_content: return "No description"
-    if not isinstance(html_content, str): return str(html_content)
-    try:
-        soup = BeautifulSoup(html_content, "html.parser")
-        return soup.get_text(separator=" ")[:5000].strip()
-    except:
-        return str(html_content)[:5000]
-
-def get_logo_url(company_name, source_domain):
-    if company_name and company_name.lower() != "unknown":
-        clean_name = re.sub(r'[^a-zA-Z0-9]', '', company_name).lower()
-        if clean_name:
-            return f"https://logos.hunter.io/{clean_name}.com"
-    return f"https://logos.hunter.io/{source_domain}"
-
-def get_category(title):
-    title = title.lower()
-    if any(x in title for x in ["developer", "engineer", "software", "react", "node", "python"]): return "Development"
-    if any(x in title for x in ["design", "ui", "ux", "artist", "creative"]): return "Design"
-    if any(x in title for x in ["marketing", "seo", "sales", "growth"]): return "Marketing"
-    return "Other"
-
-# --- 4. MAIN SCRAPER LOOP ---
+# Conditional GETs: feeds that answer 304 (or an identical body) are skipped.
+# Set RSS_HTTP_CACHE to a file path to remember validators between runs.
+HTTP_CACHE = ValidatorCache(os.environ.get("RSS_HTTP_CACHE"))
+# Every feed is on its own host; 429/503s and dropped connections are retried
+# with backoff instead of losing the feed for this run. HTTP_ARCHIVE and
+# HTTP_REPLAY record or replay raw feeds (see scraping/archive.py); a replay
+# writes nothing unless HTTP_REPLAY_WRITES=1.
+ARCHIVE, REPLAY = archive_from_env()
+DRY_RUN = dry_run_from_env()
+SESSION = PoliteSession(archive=ARCHIVE, replay=REPLAY)
+SESSION.headers.update({"User-Agent": "Mozilla/5.0 (compatible; RemoteJobBayBot/1.0; +https://remotejobbay.com/bot)"})
+# One keep-alive pool per feed host, so no feed waits on another's connection
+_adapter = HTTPAdapter(pool_connections=len(RSS_FEEDS), pool_maxsize=2)
+SESSION.mount("https://", _adapter)
+SESSION.mount("http://", _adapter)
+# Processes that parse downloaded feeds; 0 or 1 parses on the download threads
+PARSE_WORKERS = int(os.environ.get("RSS_PARSE_WORKERS", str(min(len(RSS_FEEDS), os.cpu_count() or 1))))
+# The pool starts once download and writer threads are running; a forked
+# worker could inherit a lock one of them holds (METRICS, the clean_html
+# cache) and deadlock on it, so workers come from a fork server instead.
+PARSE_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+# --- 3. MAIN SCRAPER LOOP ---
 def process_feeds():
     print("\n" + "="*40)
     print("🚀 PRODUCTION SCRAPER") 
     print("   (Jobs will be Hidden & Pending)")
     print("="*40 + "\n")
     
-    total_new_jobs = 0
-
-    for feed_source in RSS_FEEDS:
-        print(f"📥 Checking {feed_source['source']}...")
-        try:
-            feed = feedparser.parse(feed_source['url'])
-        except Exception as e:
-            print(f"   ❌ Failed to read feed: {e}")
-            continue
-        
-        total_entries = len(feed.entries)
-        if total_entries == 0:
-            print(f"   ⚠️ No entries found.")
-            continue
-            
+    # A dry run's rows aren't stored, so don't persist them as known either
+    known_ids = KnownIds(supabase, "potential_jobs",
+                         cache_path=None if DRY_RUN else os.environ.get("RSS_KNOWN_IDS_CACHE"))
+    # Boards repost each other's listings under their own ids; catch those by
+    # apply URL or near-identical content before they reach the vetting queue.
+    near_dups = NearDupIndex(None if DRY_RUN else os.environ.get("RSS_NEAR_DUP_INDEX"))
+    near_dups.seed(supabase, "potential_jobs")
+    # All feeds download side by side and are parsed in a process pool;
+    # entries from each go through the dedup + write stage below as soon as
+    # their feed is parsed.
+    parser = ProcessPoolExecutor(max_workers=PARSE_WORKERS, mp_context=PARSE_CONTEXT) if PARSE_WORKERS > 1 else None
+    sources = [RssSource(feed, SESSION, HTTP_CACHE, parser=parser) for feed in RSS_FEEDS]
+
+    def failed(row, e):
+        near_dups.discard(row["external_id"])
+        for source in sources:
+            source.write_failed(row)
+
+    writer = BatchWriter(
+        dry_run if DRY_RUN else supabase_upsert(supabase, "potential_jobs", on_conflict="external_id"),
+        batch_size=int(os.environ.get("RSS_WRITE_BATCH_SIZE", "100")),
+        flush_interval=float(os.environ.get("RSS_WRITE_FLUSH_SECONDS", "5")),
+        on_saved=lambda row: known_ids.add(row["external_id"]),
+        on_skipped=lambda row: known_ids.add(row["external_id"]),
+        on_failed=failed,
+        background=True,
+    )
+
+    def save_feed_jobs(jobs, source):
+        # One chunked `in_` lookup per feed instead of a query per entry
+        with METRICS.timer("known_ids", source=source):
+            known_ids.check_many(job["external_id"] for job in jobs)
         new_count = 0
-        skip_count = 0
-
-        for i, entry in enumerate(feed.entries): 
-            try:
-                title = getattr(entry, 'title', 'No Title')
-                link = getattr(entry, 'link', '')
-                external_id = getattr(entry, 'id', link)
-                
-                # Check Duplicates
-                existing = supabase.table("potential_jobs").select("external_id").eq("external_id", external_id).execute()
-                
-                if existing.data:
-                    skip_count += 1
-                    continue 
-
-                # Company Logic
-                company = getattr(entry, 'author', 'Unknown')
-                if company == "Unknown" and ":" in title:
-                    parts = title.split(":")
-                    if len(parts) > 1: company = parts[0].strip()
-
-                # Get description safely
-                desc = getattr(entry, 'summary', getattr(entry, 'content', [{'value': ''}])[0].get('value', ''))
-
-                # Prepare Data
-                job_data = {
-                    "external_id": str(external_id),
-                    "title": str(title),
-                    "company": str(company),
-                    "location": "Remote",
-                    "description": clean_html(desc),
-                    "salary_text": "Not Listed",   
-                    "apply_url": str(link),
-                    "logo": get_logo_url(company, feed_source['domain']),
-                    "category": get_category(title),
-                    "source_url": str(link),
-                    "source": feed_source['source'],
-                    
-                    # --- VETTING LOCKS ---
-                    "status": "pending",     # 1. Needs manual approval
-                    "post_to_site": False    # 2. Hidden from website
-                }
-
-                supabase.table("potential_jobs").insert(job_data).execute()
+        dup_count = 0
+        with METRICS.accumulate("near_dup", source) as near_dup:
+            for job in jobs:
+                if job["external_id"] in known_ids:
+                    continue
+                with near_dup:
+                    duplicate = near_dups.check_and_add(job["external_id"], job)
+                if duplicate:
+                    dup_count += 1
+                    continue
+                # --- VETTING LOCKS ---
+                job["status"] = "pending"      # 1. Needs manual approval
+                job["post_to_site"] = False    # 2. Hidden from website
+                writer.add(job)
                 new_count += 1
-                total_new_jobs += 1
-                print(f"   ✅ Saved (Hidden): {title[:30]}...")
+        METRICS.jobs(source, known=len(jobs) - new_count - dup_count, duplicate=dup_count, queued=new_count)
+        print(f"   ✅ {source}: queued {new_count} | skipped {len(jobs) - new_count} ({dup_count} cross-source duplicates)")
 
-            except Exception as e:
-                # print(f"   ❌ Error: {e}") 
-                pass 
-
-        print(f"   ✅ Added: {new_count} | Skipped: {skip_count}\n")
-
-    print(f"\n✨ DONE! Total new jobs in vetting queue: {total_new_jobs}")
+    try:
+        reports = run_sources(sources, save_feed_jobs)
+    finally:
+        if parser is not None:
+            parser.shutdown(cancel_futures=True)
+    for report in reports:
+        print(f"   {report.summary()}")
+
+    writer.flush()
+    known_ids.save()
+    near_dups.save()
+    # Every row is written (or has failed) now. The feeds share one validator
+    # cache, so drop the validators of feeds that didn't finish, or lost rows
+    # in the write stage, before the ones that did are saved.
+    finished = [not (report.timed_out or report.failed or report.write_errors) for report in reports]
+    for source, done in zip(sources, finished):
+        if not done:
+            source.forget()
+    for source, done in zip(sources, finished):
+        if done:
+            source.commit()
+    total_new_jobs = writer.saved
+    print(f"\n✨ DONE! Total new jobs in vetting queue: {total_new_jobs} ({writer.skipped} already stored, {writer.failed} failed)")
+    print(METRICS.summary())
+    METRICS.export_from_env()
 
 if __name__ == "__main__":
     process_feeds()
\ No newline at end of file
@@ -5,16 +5,28 @@ Compatible with the existing Remote Job Bay scraper framework.
 
 Functions
 ---------
-fetch_jobs(limit=None) -> List[dict]
-    Crawl InclusivelyRemote, parse each job, and return a clean list of job dicts.
+fetch_jobs(limit=None) -> Iterator[dict]
+    Crawl InclusivelyRemote and yield a clean job dict as each one is parsed.
+
+SOURCE
+    The same crawl as a ``scraping.sources.Source`` plugin for run_scraper.
 """
 
-import re, time, uuid, math
+import os, re, sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime, timezone
-from typing import List, Dict, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
-import requests
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from scraping.archive import archive_from_env
+from scraping.dedup import KnownIds
+from scraping.http_cache import ValidatorCache, conditional_get
+from scraping.http_client import PoliteSession
+from scraping.metrics import METRICS
+from scraping.sources import Source, SourceReport
 
 BASE = "https://inclusivelyremote.com"
 INDEX_URLS = [
@@ -32,9 +44,35 @@ HEADERS = {
 
 MIN_DESC_LEN = 120  # characters
 
+# Set IR_HTTP_CACHE to a file path to skip pages unchanged since the last run.
+HTTP_CACHE = ValidatorCache(os.environ.get("IR_HTTP_CACHE"))
+
+# Detail pages fetched at once, and the minimum gap between any two requests
+# to the site (all index walkers and detail fetchers share it; SESSION widens
+# it while the site answers 429/503 and retries those with backoff).
+IR_WORKERS = max(1, int(os.environ.get("IR_WORKERS", "4")))
+IR_MIN_INTERVAL = float(os.environ.get("IR_MIN_INTERVAL", "0.3"))
+
+# HTTP_ARCHIVE / HTTP_REPLAY record or replay raw pages (see scraping/archive.py)
+ARCHIVE, REPLAY = archive_from_env()
+SESSION = PoliteSession(interval=IR_MIN_INTERVAL, archive=ARCHIVE, replay=REPLAY)
+SESSION.headers.update(HEADERS)
+SESSION.mount("https://", HTTPAdapter(pool_maxsize=IR_WORKERS + len(INDEX_URLS)))
+
 
-def _get_soup(url: str) -> BeautifulSoup:
-    r = requests.get(url, headers=HEADERS, timeout=30)
+def _page_url(index: str, page: int) -> str:
+    return index if page == 1 else f"{index.rstrip('/')}/page/{page}/"
+
+
+def _get_soup(url: str, skip_unchanged: bool = False) -> Optional[BeautifulSoup]:
+    """
+    Fetch and parse `url`. With `skip_unchanged`, returns None instead when
+    the page answers 304 or is byte-identical to the last run.
+    """
+    cache = HTTP_CACHE if skip_unchanged else None
+    r, unchanged = conditional_get(SESSION, url, cache, timeout=30)
+    if unchanged:
+        return None
     r.raise_for_status()
     return BeautifulSoup(r.text, "html.parser")
 
@@ -80,46 +118,188 @@ def _parse_job_card(card) -> Dict[str, str]:
     )
 
 
-def _get_full_description(url: str) -> str:
-    soup = _get_soup(url)
+def _get_full_description(url: str) -> Optional[str]:
+    """Description HTML, or None if the page hasn't changed since the last run."""
+    soup = _get_soup(url, skip_unchanged=True)
+    if soup is None:
+        return None
     body = soup.select_one(".job-detail") or soup.select_one(".job-overview")
     return body.decode_contents() if body else ""
 
 
-def fetch_jobs(limit: Optional[int] = None) -> List[Dict]:
+def _stored_urls() -> Optional[KnownIds]:
+    """applyUrls already in the jobs table, or None without DB credentials."""
+    url = os.getenv("NEXT_PUBLIC_SUPABASE_URL") or os.getenv("SUPABASE_URL")
+    key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+    if not url or not key:
+        return None
+    from supabase import create_client
+
+    known = KnownIds(create_client(url, key), "jobs", column="applyUrl",
+                     cache_path=os.environ.get("IR_KNOWN_IDS_CACHE"))
+    known.prefetch(BASE)
+    return known
+
+
+def _fetch_details(metas: Iterable[Dict]) -> Iterator[Tuple[Dict, Optional[str], bool]]:
     """
-    Crawl inclusivelyremote.com and return a list of unique job records.
-    Set `limit` to cap the number of jobs (useful for testing).
+    (meta, description HTML, ok) as detail pages arrive, with at most
+    IR_WORKERS requests in flight. `metas` is only read as slots free up.
+    A failed page yields (meta, None, False).
     """
-    jobs: List[Dict] = []
-    seen_ids = set()
-
-    for index in INDEX_URLS:
-        page = 1
-        while True:
-            url = index if page == 1 else f"{index.rstrip('/')}/page/{page}/"
-            soup = _get_soup(url)
-            cards = soup.select(".job-listings .job-block")  # selector for job cards
-            if not cards:
-                break
-
-            for card in cards:
-                meta = _parse_job_card(card)
-                if meta["id"] in seen_ids:
-                    continue  # duplicates across indexes
-                desc_html = _get_full_description(meta["url"])
-                if len(desc_html) < MIN_DESC_LEN:
-                    continue  # skip empty listings
-                meta["description_html"] = desc_html
-                jobs.append(meta)
-                seen_ids.add(meta["id"])
-                if limit and len(jobs) >= limit:
-                    return jobs
+    todo = iter(metas)
+    with ThreadPoolExecutor(max_workers=IR_WORKERS) as pool:
+        futures = {}
+
+        def submit_next() -> None:
+            meta = next(todo, None)
+            if meta is not None:
+                futures[pool.submit(_get_full_description, meta["url"])] = meta
+
+        for _ in range(IR_WORKERS):
+            submit_next()
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                meta = futures.pop(future)
+                submit_next()
+                try:
+                    desc_html = future.result()
+                except Exception as e:
+                    print(f"  - Could not fetch {meta['url']}: {e}")
+                    yield meta, None, False
+                    continue
+                yield meta, desc_html, True
+
+
+class InclusivelyRemoteSource(Source):
+    """
+    discover: the INDEX_URLS, walked concurrently; fetch: the job cards of
+    one index, a page at a time as normalize asks for more; normalize: fetch
+    detail pages for cards we haven't stored yet and yield each job as its
+    page arrives.
+    """
+    name = "InclusivelyRemote"
+    workers = len(INDEX_URLS)
+    chunk_size = 10  # roughly one job per request, so don't hold many back
 
+    def __init__(self, limit: Optional[int] = None):
+        self.limit = limit
+        self.seen_ids = set()
+        self.kept = 0
+        self.known: Optional[KnownIds] = None
+        self.pages: Dict[str, Tuple[str, int]] = {}   # job url -> (index, page) it was listed on
+
+    def discover(self):
+        self.seen_ids = set()
+        self.kept = 0
+        self.pages = {}
+        self.known = _stored_urls()
+        return INDEX_URLS
+
+    def _full(self) -> bool:
+        return bool(self.limit) and self.kept >= self.limit
+
+    def _cards(self, index: str, page: int) -> List[Dict]:
+        """Job cards on one index page; empty if it is unchanged or past the end."""
+        soup = _get_soup(_page_url(index, page), skip_unchanged=True)
+        if soup is None:
+            return []  # listing is newest-first, so nothing past here is new
+        metas = [_parse_job_card(card) for card in soup.select(".job-listings .job-block")]
+        for meta in metas:
+            self.pages[meta["url"]] = (index, page)
+        return metas
+
+    def fetch(self, index: str) -> Iterator[Dict]:
+        # Page 1 is fetched here, on the source's pool, so every index starts
+        # at once; later pages only as normalize runs out of cards, so detail
+        # pages start arriving after one index page rather than all of them.
+        return self._walk(index, self._cards(index, 1))
+
+    def _walk(self, index: str, metas: List[Dict]) -> Iterator[Dict]:
+        page, count = 1, 0
+        while metas:
+            yield from metas
+            count += len(metas)
+            if self.limit and count >= self.limit:
+                return
             page += 1
-            time.sleep(1.2)  # be polite
+            try:
+                metas = self._cards(index, page)
+            except Exception as e:
+                # Unlike a 304 this says nothing about the pages further
+                # down, so make the next run walk back down to here.
+                METRICS.inc("errors_total", source=self.name, stage="fetch")
+                print(f"  - {self.name}: could not fetch {_page_url(index, page)}: {e}")
+                self._forget_pages(index, page)
+                return
+
+    def normalize(self, index: str, metas: Iterator[Dict]) -> Iterator[Dict]:
+        def todo() -> Iterator[Dict]:
+            for meta in metas:
+                if meta["id"] in self.seen_ids:
+                    continue  # duplicates across indexes
+                self.seen_ids.add(meta["id"])
+                if self.known is not None and meta["url"] in self.known:
+                    continue  # stored on a previous run
+                yield meta
+
+        for meta, desc_html, ok in _fetch_details(todo()):
+            if self._full():
+                return
+            if not ok:
+                self._forget(meta["url"])  # failed, not unchanged: retry it next run
+                continue
+            if desc_html is None:
+                continue  # unchanged since the last run
+            if len(desc_html) < MIN_DESC_LEN:
+                continue  # skip empty listings
+            meta["description_html"] = desc_html
+            meta["applyUrl"] = meta["url"]
+            self.kept += 1
+            yield meta
+
+    def finish(self) -> None:
+        if self.known is not None:
+            self.known.save()
 
-    return jobs
+    def commit(self) -> None:
+        # Only now are the rows behind this run's validators written; a run
+        # cut short by `limit` left pages unprocessed, so keep the old ones.
+        if not self._full():
+            HTTP_CACHE.save()
+
+    def write_failed(self, row: dict) -> None:
+        self._forget(row.get("applyUrl"))
+
+    def _forget(self, url: Optional[str]) -> None:
+        # Forget the job's detail page and the index pages down to the one
+        # listing it, or the next run stops at a 304 and never sees it again.
+        if url not in self.pages:
+            return
+        index, page = self.pages[url]
+        HTTP_CACHE.forget(url)
+        self._forget_pages(index, page)
+
+    @staticmethod
+    def _forget_pages(index: str, page: int) -> None:
+        for n in range(1, page + 1):
+            HTTP_CACHE.forget(_page_url(index, n))
+
+
+SOURCE = InclusivelyRemoteSource()
+
+
+def fetch_jobs(limit: Optional[int] = None) -> Iterator[Dict]:
+    """
+    Crawl inclusivelyremote.com and yield unique job records as they are
+    parsed. Set `limit` to cap the number of jobs (useful for testing).
+    HTTP validators are not saved: the caller decides what gets written.
+    """
+    source = InclusivelyRemoteSource(limit)
+    for rows in source.batches(SourceReport(source.name)):
+        yield from rows
+    source.finish()
 
 
 # For CLI testing
@@ -127,6 +307,9 @@ if __name__ == "__main__":
     import json, sys
 
     n = int(sys.argv[1]) if len(sys.argv) > 1 else None
-    data = fetch_jobs(limit=n)
-    print(json.dumps(data[:5], indent=2))
-    print(f"Fetched {len(data)} jobs.")
+    count = 0
+    for job in fetch_jobs(limit=n):
+        if count < 5:
+            print(json.dumps(job, indent=2))
+        count += 1
+    print(f"Fetched {count} jobs.")
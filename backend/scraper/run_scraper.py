@@ -1,46 +1,103 @@
 #!/usr/bin/env python3
 """
 Master scraper runner for Remote Job Bay
+
+Every module named in SOURCE_MODULES is a plugin exposing ``SOURCE``, a
+``scraping.sources.Source``. All sources run concurrently and stream their
+jobs into one upload stage; a module that is missing or fails to import is
+skipped with a warning, and a source that crashes or times out doesn't stop
+the others.
 """
 
-from remoteok import scrape_remoteok           # already working
-from weworkremotely import scrape_wwr          # already working
-# from remotive import scrape_remotive        # SSL 526 issue – disabled for now
-from inclusivelyremote import fetch_jobs as scrape_inclusivelyremote  # NEW
+import importlib
+import os
+import sys
+
+from supabase import create_client
+from utils import DRY_RUN, SUPABASE_KEY, SUPABASE_URL, job_writer, prepare_job
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from scraping.metrics import METRICS
+from scraping.near_dup import NearDupIndex
+from scraping.sources import run_sources
+
+SOURCE_MODULES = [
+    "remoteok",             # already working
+    "weworkremotely",       # already working
+    # "remotive",           # SSL 526 issue – disabled for now
+    "inclusivelyremote",    # NEW
+]
+
+# Optional file persisting the cross-source duplicate index between runs, so
+# the jobs table is read in full only on the first run and merely pruned on
+# later ones; without it every run indexes the whole table.
+NEAR_DUP_INDEX = os.getenv("UPLOAD_NEAR_DUP_INDEX")
+
+
+def load_sources():
+    sources = []
+    for module_name in SOURCE_MODULES:
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError as e:
+            print(f"  ⚠️ Skipping {module_name}: {e}")
+            continue
+        source = getattr(module, "SOURCE", None)
+        if source is None:
+            print(f"  ⚠️ Skipping {module_name}: no SOURCE defined")
+            continue
+        sources.append(source)
+    return sources
 
-from utils import insert_job
 
 def main() -> None:
     print("📡 Starting scrapers...")
 
-    all_jobs = []
+    sources = load_sources()
+    for source in sources:
+        print(f"  • {source.name}")
 
-    # RemoteOK
-    print("  • RemoteOK …", end=" ", flush=True)
-    all_jobs += scrape_remoteok()
-    print("done.")
+    near_dups = NearDupIndex(None if DRY_RUN else NEAR_DUP_INDEX, url_field="applyUrl")
+    near_dups.seed(create_client(SUPABASE_URL, SUPABASE_KEY), "jobs", key_column="applyUrl")
+    duplicates = 0
 
-    # WeWorkRemotely
-    print("  • WeWorkRemotely …", end=" ", flush=True)
-    all_jobs += scrape_wwr()
-    print("done.")
+    def failed(job):
+        near_dups.discard(job.get("applyUrl"))
+        for source in sources:
+            source.write_failed(job)
 
-    # InclusivelyRemote
-    print("  • InclusivelyRemote …", end=" ", flush=True)
-    all_jobs += scrape_inclusivelyremote()
-    print("done.")
+    with job_writer(on_failed=failed) as writer:
+        def upload(jobs, source):
+            nonlocal duplicates
+            skipped = 0
+            with METRICS.accumulate("near_dup", source) as near_dup:
+                for job in jobs:
+                    with near_dup:
+                        duplicate = bool(job.get("applyUrl")) and near_dups.check_and_add(job["applyUrl"], job)
+                    if duplicate:
+                        skipped += 1
+                        continue
+                    writer.add(prepare_job(job))
+            duplicates += skipped
+            METRICS.jobs(source, duplicate=skipped, queued=len(jobs) - skipped)
 
-    # Remotive (disabled)
-    # print("  • Remotive …", end=" ", flush=True)
-    # all_jobs += scrape_remotive()
-    # print("done.")
+        reports = run_sources(sources, upload)
 
-    print(f"🔎 Parsed {len(all_jobs)} jobs. Uploading to Supabase…")
+    for report in reports:
+        print(f"  {report.summary()}")
+    # Every row is written (or has failed) now, so sources that ran to the
+    # end can persist what they'd otherwise skip next run
+    for source, report in zip(sources, reports):
+        if not report.timed_out and not report.failed:
+            source.commit()
 
-    for job in all_jobs:
-        insert_job(job)
+    near_dups.save()
+    if duplicates:
+        print(f"  Skipped {duplicates} jobs already listed by another source.")
 
-    print("✅ Finished!")
+    print(f"✅ Finished! Uploaded {writer.saved} jobs.")
+    print(METRICS.summary())
+    METRICS.export_from_env()
 
 if __name__ == "__main__":
     main()
@@ -5,9 +5,15 @@ without hard‑coding credentials.
 """
 
 import os
-import requests
+import sys
+from typing import Callable, Iterable, Optional
+
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from scraping.archive import dry_run_from_env
+from scraping.writer import BatchWriter, dry_run, rest_upsert
+
 # ── Load credentials from .env ────────────────────────────────────────────────
 load_dotenv()  # reads .env / .env.local
 
@@ -24,10 +30,15 @@ HEADERS = {
     "Prefer": "resolution=merge-duplicates,return=representation",
 }
 
-# ── Public helper ─────────────────────────────────────────────────────────────
-def insert_job(job: dict) -> None:
-    """Insert or upsert a job row into Supabase."""
-    # Default values
+UPLOAD_BATCH_SIZE = int(os.getenv("UPLOAD_BATCH_SIZE", "100"))
+UPLOAD_FLUSH_SECONDS = float(os.getenv("UPLOAD_FLUSH_SECONDS", "5"))
+# Replaying an archive (HTTP_REPLAY) uploads nothing unless HTTP_REPLAY_WRITES=1;
+# these rows skip vetting and would go live straight away
+DRY_RUN = dry_run_from_env()
+
+# ── Public helpers ────────────────────────────────────────────────────────────
+def prepare_job(job: dict) -> dict:
+    """Fill in the defaults the `jobs` table expects."""
     job.setdefault("type", "Full‑Time")
     job.setdefault("category", "General")
     job.setdefault("salaryType", "Negotiable")
@@ -40,17 +51,39 @@ def insert_job(job: dict) -> None:
         job["salary"] = float(job.get("salary", 0))
     except (TypeError, ValueError):
         job["salary"] = 0
+    return job
+
 
-    # Upsert (on_conflict=applyUrl) via Supabase REST
-    resp = requests.post(
-        f"{SUPABASE_URL}/rest/v1/jobs?on_conflict=applyUrl",
-        headers=HEADERS,
-        json=[job],
-        timeout=30,
+def job_writer(on_failed: Optional[Callable[[dict], None]] = None) -> BatchWriter:
+    """
+    Buffered uploader: rows are upserted (on_conflict=applyUrl) in batches of
+    UPLOAD_BATCH_SIZE on a background thread, falling back to one request per
+    row if a batch fails. `on_failed(job)` is called for rows that still fail.
+    """
+    def failed(job, e):
+        print(f"❌ Failed: {job.get('title','(no title)')} — {e}")
+        if on_failed is not None:
+            on_failed(job)
+
+    return BatchWriter(
+        dry_run if DRY_RUN else rest_upsert(SUPABASE_URL, HEADERS, "jobs", on_conflict="applyUrl"),
+        batch_size=UPLOAD_BATCH_SIZE,
+        flush_interval=UPLOAD_FLUSH_SECONDS,
+        key="applyUrl",
+        background=True,
+        on_saved=lambda job: print(f"✅ Uploaded: {job.get('title','(no title)')}"),
+        on_failed=failed,
     )
 
-    if resp.status_code >= 400:
-        print(f"❌ Failed: {job.get('title','(no title)')} — {resp.status_code}")
-        print("Response:", resp.text)
-    else:
-        print(f"✅ Uploaded: {job.get('title','(no title)')}")
+
+def insert_jobs(jobs: Iterable[dict]) -> int:
+    """Upsert many job rows in batches. Returns the number written."""
+    with job_writer() as writer:
+        for job in jobs:
+            writer.add(prepare_job(job))
+    return writer.saved
+
+
+def insert_job(job: dict) -> None:
+    """Insert or upsert a single job row into Supabase."""
+    insert_jobs([job])
@@ -0,0 +1,204 @@
+"""
+In-memory BM25 full-text index over the job list.
+
+Documents are keyed by job id. ``update`` diffs the new job list against what
+is already indexed (by a hash of each job's title/company/description) and
+only re-tokenizes jobs that were added or changed, so a reload of the jobs
+file costs roughly the size of the change rather than the whole dataset.
+``copy`` makes a copy-on-write clone to update, so an index that is being
+read is never modified.
+
+Queries run Fagin's threshold algorithm over per-term postings sorted by
+their BM25 contribution, so a top-k query over common terms stops after the
+first few hundred postings instead of scoring every match. The sorted lists
+are built on first use and dropped whenever the corpus changes.
+"""
+
+import hashlib
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Container, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*")
+
+# Term-frequency weights per field: a title hit counts more than a body hit
+FIELD_WEIGHTS = (("title", 3), ("company", 2), ("description", 1))
+
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text) -> List[str]:
+    if not text:
+        return []
+    return TOKEN_RE.findall(str(text).lower())
+
+
+def _doc_hash(job: dict) -> bytes:
+    h = hashlib.blake2b(digest_size=16)
+    for field, _ in FIELD_WEIGHTS:
+        h.update(str(job.get(field) or "").encode("utf-8", "surrogatepass"))
+        h.update(b"\0")
+    return h.digest()
+
+
+class SearchIndex:
+    def __init__(self):
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.doc_terms: Dict[str, Dict[str, int]] = {}
+        self.doc_len: Dict[str, int] = {}
+        self._hashes: Dict[str, bytes] = {}
+        self._total_len = 0
+        self._norms: Dict[str, float] = {}
+        self._impacts: Dict[str, Tuple[float, List[Tuple[float, str]]]] = {}
+        # Terms whose posting dicts this index may modify; None means all
+        self._owned: Optional[Set[str]] = None
+
+    def copy(self) -> "SearchIndex":
+        """Clone sharing posting dicts until they're modified."""
+        clone = SearchIndex()
+        clone.postings = dict(self.postings)
+        clone.doc_terms = dict(self.doc_terms)
+        clone.doc_len = dict(self.doc_len)
+        clone._hashes = dict(self._hashes)
+        clone._total_len = self._total_len
+        clone._norms = self._norms
+        clone._impacts = dict(self._impacts)
+        clone._owned = set()
+        return clone
+
+    def _docs(self, token: str) -> Dict[str, int]:
+        """Writable posting dict for `token`, unsharing it first if needed."""
+        docs = self.postings.get(token)
+        if docs is None:
+            docs = self.postings[token] = {}
+        elif self._owned is not None and token not in self._owned:
+            docs = self.postings[token] = dict(docs)
+        if self._owned is not None:
+            self._owned.add(token)
+        return docs
+
+    def __len__(self) -> int:
+        return len(self.doc_len)
+
+    def _add(self, doc_id: str, job: dict) -> None:
+        terms: Counter = Counter()
+        for field, weight in FIELD_WEIGHTS:
+            counts = Counter(tokenize(job.get(field)))
+            if weight != 1:
+                for token in counts:
+                    counts[token] *= weight
+            terms.update(counts)
+        for token, tf in terms.items():
+            self._docs(token)[doc_id] = tf
+        length = sum(terms.values())
+        self.doc_terms[doc_id] = dict(terms)
+        self.doc_len[doc_id] = length
+        self._total_len += length
+
+    def _remove(self, doc_id: str) -> None:
+        for token in self.doc_terms.pop(doc_id, ()):
+            docs = self._docs(token)
+            del docs[doc_id]
+            if not docs:
+                del self.postings[token]
+        self._total_len -= self.doc_len.pop(doc_id, 0)
+        self._hashes.pop(doc_id, None)
+
+    def update(self, jobs: Iterable[dict]) -> Tuple[int, int]:
+        """
+        Sync the index with `jobs`. Returns (reindexed, removed) counts.
+        """
+        seen = set()
+        reindexed = 0
+        for job in jobs:
+            doc_id = str(job.get("id"))
+            seen.add(doc_id)
+            digest = _doc_hash(job)
+            if self._hashes.get(doc_id) == digest:
+                continue
+            self._remove(doc_id)
+            self._add(doc_id, job)
+            self._hashes[doc_id] = digest
+            reindexed += 1
+
+        gone = [doc_id for doc_id in self.doc_len if doc_id not in seen]
+        for doc_id in gone:
+            self._remove(doc_id)
+
+        # Length normalisation and idf depend on the whole corpus
+        if reindexed or gone:
+            avgdl = (self._total_len / len(self.doc_len)) if self.doc_len else 1.0
+            self._norms = {d: K1 * (1 - B + B * n / avgdl) for d, n in self.doc_len.items()}
+            self._impacts = {}
+        if self._owned is not None:
+            self._owned = set()
+        return reindexed, len(gone)
+
+    def _term(self, token: str) -> Optional[Tuple[float, List[Tuple[float, str]]]]:
+        """(idf boost, postings sorted by descending score contribution)."""
+        cached = self._impacts.get(token)
+        if cached is None:
+            docs = self.postings.get(token)
+            if not docs:
+                return None
+            n_docs = len(self.doc_len)
+            boost = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5)) * (K1 + 1)
+            norms = self._norms
+            ranked = sorted(((boost * tf / (tf + norms[d]), d) for d, tf in docs.items()), reverse=True)
+            cached = self._impacts[token] = (boost, ranked)
+        return cached
+
+    def top(
+        self, query: str, k: int, allowed: Optional[Container[str]] = None, order: Optional[Mapping[str, int]] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        The `k` best (doc_id, score) pairs, best first. `allowed` restricts
+        results to those doc ids. Equal scores rank by `order` (lowest
+        first) when given, else by doc id.
+        """
+        terms = []
+        for token in sorted(set(tokenize(query))):
+            term = self._term(token)
+            if term is not None:
+                terms.append((self.postings[token], term[0], term[1]))
+        if not terms or k <= 0:
+            return []
+
+        norms = self._norms
+        tie = (lambda doc_id: -order[doc_id]) if order is not None else (lambda doc_id: doc_id)
+        heap: List[Tuple[float, object, str]] = []
+        seen = set()
+        depth = 0
+        while True:
+            threshold = 0.0
+            advanced = False
+            for _, _, ranked in terms:
+                if depth >= len(ranked):
+                    continue
+                advanced = True
+                impact, doc_id = ranked[depth]
+                threshold += impact
+                if doc_id in seen:
+                    continue
+                seen.add(doc_id)
+                if allowed is not None and doc_id not in allowed:
+                    continue
+                score = 0.0
+                for docs, boost, _ in terms:
+                    tf = docs.get(doc_id)
+                    if tf:
+                        score += boost * tf / (tf + norms[doc_id])
+                entry = (score, tie(doc_id), doc_id)
+                if len(heap) < k:
+                    heapq.heappush(heap, entry)
+                elif entry[:2] > heap[0][:2]:
+                    heapq.heapreplace(heap, entry)
+            depth += 1
+            # No unseen document can beat, or tie with, the current k-th best
+            if not advanced or (len(heap) == k and heap[0][0] > threshold):
+                break
+
+        return [(doc_id, score) for score, _, doc_id in sorted(heap, reverse=True)]
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: compiled remote-eligibility classifier vs. the old
+substring-scan implementation.
+
+    python benchmarks/bench_remote_filter.py [num_jobs]
+
+Builds a deterministic corpus of ATS-style postings (titles from
+backend/remote_jobs.json plus generated ~5000-char descriptions with a
+realistic sprinkling of location restrictions), checks that both
+implementations agree on every job, then times them.
+"""
+
+import json
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from scraping.remote_filter import REMOTE_ANYWHERE  # noqa: E402
+
+
+def legacy_is_remote_anywhere(title, location, description):
+    # Verbatim copy of the original ats_directory_scraper.is_remote_anywhere
+    text = f"{title} {location} {description}".lower()
+
+    restricted_phrases = [
+        "us only", "usa only", "united states only", "united kingdom only", "uk only", "eu only",
+        "europe only", "emea only", "apac only", "canada only", "australia only", "new zealand only",
+        "india only", "philippines only", "latin america only", "latam only", "north america only",
+        "south america only", "africa only", "middle east only", "remote - us", "remote (us)",
+        "remote - uk", "remote - eu", "remote - canada", "remote - europe", "remote - emea",
+        "must be located in", "must reside in", "must live in", "eligible to work in",
+        "work authorization", "work authorisation", "citizen only",
+    ]
+
+    if any(phrase in text for phrase in restricted_phrases):
+        return False
+
+    positive_keywords = [
+        "remote anywhere", "work from anywhere", "worldwide", "global", "anywhere", "distributed",
+        "remote (global)", "remote - global", "remote - worldwide",
+    ]
+
+    explicit = any(k in text for k in positive_keywords)
+    if explicit:
+        return True
+
+    remote_flag = "remote" in text or "work from home" in text or "distributed" in text
+    location_clean = (location or "").strip().lower()
+    location_empty = location_clean == "" or location_clean in ["remote", "worldwide", "global", "anywhere"]
+
+    if remote_flag and location_empty:
+        return True
+
+    return False
+
+
+SENTENCES = [
+    "We are looking for a thoughtful engineer to join our platform team.",
+    "You will own services end to end, from design through on-call.",
+    "Our stack includes Python, TypeScript, Postgres and Kubernetes.",
+    "We value clear written communication and async collaboration.",
+    "Benefits include health insurance, equity and a learning budget.",
+    "You will partner closely with product, design and data science.",
+    "Experience with CI/CD pipelines and observability tooling is a plus.",
+    "We ship small changes often and review each other's work carefully.",
+    "The interview process has four steps and takes about two weeks.",
+    "We are an equal opportunity employer and celebrate diversity.",
+]
+RESTRICTIONS = [
+    "This role is US only.", "Candidates must reside in Canada.", "Remote - EU.",
+    "You must be eligible to work in the United Kingdom.", "Remote (US) with occasional travel.",
+    "Work authorization is required.", "LATAM only.",
+]
+POSITIVES = [
+    "This position is fully remote and you can work from anywhere.", "We are a distributed team.",
+    "Open to candidates worldwide.", "Join our global team.",
+]
+LOCATIONS = ["", "Remote", "Remote", "Worldwide", "New York, NY", "London", "Remote - Global", "Berlin"]
+
+
+def build_corpus(n):
+    rng = random.Random(42)
+    titles_path = os.path.join(ROOT, "backend", "remote_jobs.json")
+    with open(titles_path, "r", encoding="utf-8") as f:
+        titles = [job["title"] for job in json.load(f)]
+
+    jobs = []
+    for _ in range(n):
+        parts = []
+        while sum(len(p) + 1 for p in parts) < 5000:
+            parts.append(rng.choice(SENTENCES))
+        roll = rng.random()
+        if roll < 0.3:
+            parts.insert(rng.randrange(len(parts)), rng.choice(RESTRICTIONS))
+        elif roll < 0.55:
+            parts.insert(rng.randrange(len(parts)), rng.choice(POSITIVES))
+        jobs.append({
+            "title": rng.choice(titles),
+            "location": rng.choice(LOCATIONS),
+            "description": " ".join(parts)[:5000],
+        })
+    return jobs
+
+
+def timed(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    jobs = build_corpus(n)
+
+    legacy = [legacy_is_remote_anywhere(j["title"], j["location"], j["description"]) for j in jobs]
+    single = [REMOTE_ANYWHERE.classify(j["title"], j["location"], j["description"]).remote for j in jobs]
+    batch = [v.remote for v in REMOTE_ANYWHERE.classify_many(jobs)]
+    assert legacy == single == batch, "classifier disagrees with the legacy implementation"
+
+    t_legacy = timed(lambda: [legacy_is_remote_anywhere(j["title"], j["location"], j["description"]) for j in jobs])
+    t_single = timed(lambda: [REMOTE_ANYWHERE.classify(j["title"], j["location"], j["description"]) for j in jobs])
+    t_batch = timed(lambda: REMOTE_ANYWHERE.classify_many(jobs))
+
+    print(f"{n} jobs, {sum(legacy)} remote-anywhere")
+    for name, t in [("legacy substring scans", t_legacy), ("classify()", t_single), ("classify_many()", t_batch)]:
+        print(f"  {name:<24} {t * 1000:8.1f} ms  {t / n * 1e6:7.1f} us/job  x{t_legacy / t:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,395 @@
+"""
+Local stand-ins for every service the scrapers talk to.
+
+``MockServer`` is one threaded HTTP server that answers for all of them,
+dispatching on the host the request was originally meant for:
+
+* Greenhouse, Lever and Workable sitemaps and job APIs,
+* RSS feeds (any path containing ``rss`` or ``feed``, on any host),
+* InclusivelyRemote index and detail pages,
+* a fake Supabase REST endpoint (``/rest/v1/<table>``) that understands the
+  handful of PostgREST filters the scrapers use and keeps rows in memory.
+
+Content is synthetic but deterministic (seeded per company/feed), responses
+carry ETags and honour ``If-None-Match``, and every response can be delayed
+by a fixed latency. Scraper sessions are pointed at the server by mounting a
+``MockAdapter``, which rewrites ``https://<host>/<path>`` to the local port
+and passes the original host along in ``X-Mock-Host``.
+"""
+
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlsplit, urlunsplit
+
+from requests.adapters import HTTPAdapter
+
+WORDS = (
+    "platform team build scale python typescript data pipeline customer product growth "
+    "cloud infrastructure reliability api design mentor ship features review code "
+    "analytics security kubernetes postgres react mobile payments support async "
+    "ownership roadmap collaborate distributed systems performance testing quality"
+).split()
+TITLES = [
+    "Senior Backend Engineer", "Frontend Engineer", "Product Designer", "Data Engineer",
+    "Site Reliability Engineer", "Customer Success Manager", "Engineering Manager",
+    "Full Stack Developer", "Machine Learning Engineer", "Technical Writer",
+]
+LOCATIONS = ["Remote - Worldwide", "Anywhere", "Remote", "Remote (US)", "Remote - EU", "Berlin"]
+
+HOSTS = {
+    "greenhouse": ("boards.greenhouse.io", "boards-api.greenhouse.io"),
+    "lever": ("jobs.lever.co", "api.lever.co"),
+    "workable": ("apply.workable.com", "apply.workable.com"),
+}
+IR_HOST = "inclusivelyremote.com"
+
+
+class Sizes:
+    def __init__(
+        self,
+        companies: int = 40,
+        jobs: int = 25,
+        entries: int = 100,
+        ir_pages: int = 3,
+        ir_jobs: int = 20,
+        desc_words: int = 250,
+        sitemap_chunk: int = 200,
+    ):
+        self.companies = companies          # per ATS
+        self.jobs = jobs                    # per company
+        self.entries = entries              # per RSS feed
+        self.ir_pages = ir_pages            # per InclusivelyRemote index
+        self.ir_jobs = ir_jobs              # per InclusivelyRemote page
+        self.desc_words = desc_words
+        self.sitemap_chunk = sitemap_chunk  # urls per child sitemap
+
+
+def _rng(*parts) -> random.Random:
+    return random.Random(zlib.crc32("|".join(map(str, parts)).encode()))
+
+
+def _description(rng: random.Random, n: int) -> str:
+    paras = []
+    while n > 0:
+        k = min(n, rng.randint(30, 60))
+        paras.append("<p>" + " ".join(rng.choice(WORDS) for _ in range(k)) + ".</p>")
+        n -= k
+    return "".join(paras)
+
+
+class Corpus:
+    """Deterministic synthetic payloads; each body is built once and cached."""
+
+    def __init__(self, sizes: Sizes):
+        self.sizes = sizes
+        self._cache: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def body(self, key: str, build) -> bytes:
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached is None:
+            cached = build()
+            with self._lock:
+                self._cache[key] = cached
+        return cached
+
+    def companies(self, ats: str) -> List[str]:
+        return [f"{ats}-co{i:04d}" for i in range(self.sizes.companies)]
+
+    def _jobs(self, ats: str, company: str):
+        rng = _rng(ats, company)
+        for i in range(self.sizes.jobs):
+            yield i, rng.choice(TITLES), rng.choice(LOCATIONS), _description(rng, self.sizes.desc_words)
+
+    # --- ATS ---
+    def sitemap(self, ats: str, path: str) -> Optional[bytes]:
+        board = HOSTS[ats][0]
+        companies = self.companies(ats)
+        chunk = self.sizes.sitemap_chunk
+        urls = [
+            f"https://{board}/{co}/jobs/{i}" if ats == "greenhouse" else
+            f"https://{board}/{co}/{i}" if ats == "lever" else
+            f"https://{board}/{co}/j/{i}/"
+            for co in companies for i in range(2)
+        ]
+        if path == "/sitemap.xml":
+            children = "".join(
+                f"<sitemap><loc>https://{board}/sitemap-{n}.xml</loc></sitemap>"
+                for n in range((len(urls) + chunk - 1) // chunk)
+            )
+            return f'<?xml version="1.0"?><sitemapindex>{children}</sitemapindex>'.encode()
+        m = re.fullmatch(r"/sitemap-(\d+)\.xml", path)
+        if not m:
+            return None
+        n = int(m.group(1))
+        locs = "".join(f"<url><loc>{u}</loc></url>" for u in urls[n * chunk:(n + 1) * chunk])
+        return f'<?xml version="1.0"?><urlset>{locs}</urlset>'.encode()
+
+    def greenhouse(self, company: str) -> bytes:
+        return json.dumps({"jobs": [
+            {"id": i, "title": title, "location": {"name": loc}, "content": desc,
+             "absolute_url": f"https://boards.greenhouse.io/{company}/jobs/{i}",
+             "updated_at": "2024-01-01T00:00:00Z"}
+            for i, title, loc, desc in self._jobs("greenhouse", company)
+        ]}).encode()
+
+    def lever(self, company: str) -> bytes:
+        return json.dumps([
+            {"id": f"{company}-{i}", "text": title, "categories": {"location": loc, "commitment": "Full-time"},
+             "description": desc, "hostedUrl": f"https://jobs.lever.co/{company}/{i}"}
+            for i, title, loc, desc in self._jobs("lever", company)
+        ]).encode()
+
+    def workable(self, company: str) -> bytes:
+        return json.dumps({"results": [
+            {"id": i, "shortcode": f"W{i}", "title": title, "location": {"city": loc},
+             "description": desc, "shortlink": f"https://apply.workable.com/j/{company}-{i}"}
+            for i, title, loc, desc in self._jobs("workable", company)
+        ]}).encode()
+
+    # --- RSS ---
+    def feed(self, host: str) -> bytes:
+        rng = _rng("rss", host)
+        items = []
+        for i in range(self.sizes.entries):
+            company = f"Company{rng.randint(1, 500)}"
+            desc = _description(rng, self.sizes.desc_words)
+            items.append(
+                f"<item><title>{company}: {rng.choice(TITLES)}</title>"
+                f"<link>https://{host}/jobs/{i}</link><guid>https://{host}/jobs/{i}</guid>"
+                f"<description><![CDATA[{desc}]]></description></item>"
+            )
+        return (
+            f'<?xml version="1.0"?><rss version="2.0"><channel><title>{host}</title>'
+            f'{"".join(items)}</channel></rss>'
+        ).encode()
+
+    # --- InclusivelyRemote ---
+    def ir_index(self, index: str, page: int) -> bytes:
+        cards = []
+        if page <= self.sizes.ir_pages:
+            rng = _rng("ir", index, page)
+            for i in range(self.sizes.ir_jobs):
+                # Indexes overlap a little, like the real site's categories do
+                slug = f"job-{rng.randint(0, self.sizes.ir_pages * self.sizes.ir_jobs * 3)}"
+                cards.append(
+                    f'<div class="job-block"><h3><a href="https://{IR_HOST}/job/{slug}/">'
+                    f'{rng.choice(TITLES)}</a></h3><span class="company-name">Company{i}</span>'
+                    f'<span class="job-location">Worldwide Remote Jobs</span>'
+                    f'<time datetime="2024-01-0{1 + i % 9}T00:00:00Z"></time></div>'
+                )
+        return f'<html><body><div class="job-listings">{"".join(cards)}</div></body></html>'.encode()
+
+    def ir_detail(self, slug: str) -> bytes:
+        desc = _description(_rng("ir-detail", slug), self.sizes.desc_words)
+        return f'<html><body><div class="job-detail">{desc}</div></body></html>'.encode()
+
+
+class FakeSupabase:
+    """In-memory tables behind the PostgREST subset the scrapers use."""
+
+    def __init__(self):
+        self.tables: Dict[str, Dict[str, dict]] = {}
+        self.inserted: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def rows(self, table: str) -> List[dict]:
+        with self._lock:
+            return list(self.tables.get(table, {}).values())
+
+    def select(self, table: str, query: List) -> List[dict]:
+        rows = self.rows(table)
+        columns, offset, limit = None, 0, None
+        for key, value in query:
+            if key == "select":
+                columns = None if value == "*" else value.split(",")
+            elif key == "offset":
+                offset = int(value)
+            elif key == "limit":
+                limit = int(value)
+            elif value.startswith("like."):
+                pattern = re.escape(value[5:]).replace("%", ".*").replace(r"\*", ".*")
+                rows = [r for r in rows if re.fullmatch(pattern, str(r.get(key, "")))]
+            elif value.startswith("in.("):
+                wanted = {v.strip('"') for v in re.findall(r'"(?:[^"\\]|\\.)*"|[^,()]+', value[4:-1])}
+                rows = [r for r in rows if str(r.get(key)) in wanted]
+            elif value.startswith("eq."):
+                rows = [r for r in rows if str(r.get(key)) == value[3:]]
+        rows = rows[offset:None if limit is None else offset + limit]
+        if columns:
+            rows = [{c: r.get(c) for c in columns} for r in rows]
+        return rows
+
+    def upsert(self, table: str, query: List, rows: List[dict], prefer: str) -> List[dict]:
+        conflict = dict(query).get("on_conflict", "id")
+        ignore = "ignore-duplicates" in prefer
+        written = []
+        with self._lock:
+            stored = self.tables.setdefault(table, {})
+            for row in rows:
+                key = str(row.get(conflict, len(stored)))
+                if key in stored and ignore:
+                    continue
+                if key not in stored:
+                    self.inserted[table] += 1
+                stored[key] = dict(stored.get(key, {}), **row)
+                written.append(stored[key])
+        return written
+
+    def update(self, table: str, query: List, fields: dict) -> List[dict]:
+        filters = [(k, v[3:]) for k, v in query if v.startswith("eq.")]
+        updated = []
+        with self._lock:
+            for row in self.tables.get(table, {}).values():
+                if all(str(row.get(k)) == v for k, v in filters):
+                    row.update(fields)
+                    updated.append(row)
+        return updated
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "MockServer"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body: bytes = b"", content_type: str = "application/json") -> None:
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        if status == 200 and self.command == "GET" and self.headers.get("If-None-Match") == etag:
+            status, body = 304, b""
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if status == 200:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+        self.server.record(self.headers.get("X-Mock-Host") or self.headers.get("Host", ""), len(body))
+
+    def _route(self):
+        host = (self.headers.get("X-Mock-Host") or "").lower()
+        parts = urlsplit(self.path)
+        path, query = parts.path, parse_qsl(parts.query, keep_blank_values=True)
+        corpus = self.server.corpus
+
+        if path.startswith("/rest/v1/"):
+            table = path[len("/rest/v1/"):]
+            if self.command in ("POST", "PATCH"):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"[]")
+                if self.command == "PATCH":
+                    return 200, json.dumps(self.server.db.update(table, query, body)).encode(), "application/json"
+                written = self.server.db.upsert(table, query, body if isinstance(body, list) else [body],
+                                                self.headers.get("Prefer", ""))
+                return 201, json.dumps(written).encode(), "application/json"
+            return 200, json.dumps(self.server.db.select(table, query)).encode(), "application/json"
+
+        for ats, (board, api) in HOSTS.items():
+            if host == board and path.startswith("/sitemap"):
+                body = corpus.body(host + path, lambda: corpus.sitemap(ats, path))
+                return (200, body, "application/xml") if body else (404, b"", "text/plain")
+            if host == api:
+                m = re.fullmatch(r"/v1/boards/([^/]+)/jobs|/v0/postings/([^/]+)|/api/v3/accounts/([^/]+)/jobs", path)
+                if m:
+                    company = next(g for g in m.groups() if g)
+                    if company not in corpus.companies(ats):
+                        return 404, b"", "application/json"
+                    build = getattr(corpus, ats)
+                    return 200, corpus.body(f"{ats}:{company}", lambda: build(company)), "application/json"
+
+        if host == IR_HOST:
+            m = re.fullmatch(r"/job/([^/]+)/?", path)
+            if m:
+                return 200, corpus.body(path, lambda: corpus.ir_detail(m.group(1))), "text/html"
+            m = re.fullmatch(r"(/job-(?:location|type)/[^/]+)(?:/page/(\d+))?/?", path)
+            if m:
+                page = int(m.group(2) or 1)
+                return 200, corpus.body(path, lambda: corpus.ir_index(m.group(1), page)), "text/html"
+
+        if "rss" in self.path or "feed" in path:
+            return 200, corpus.body(host + self.path, lambda: corpus.feed(host)), "application/rss+xml"
+        return 404, b"", "text/plain"
+
+    def _handle(self):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        try:
+            status, body, content_type = self._route()
+        except Exception as e:
+            status, body, content_type = 500, str(e).encode(), "text/plain"
+        self._send(status, body, content_type)
+
+    do_GET = do_HEAD = do_POST = do_PATCH = _handle
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, sizes: Optional[Sizes] = None, latency: float = 0.0, port: int = 0):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.corpus = Corpus(sizes or Sizes())
+        self.db = FakeSupabase()
+        self.latency = latency
+        self.requests: Counter = Counter()
+        self.bytes_sent = 0
+        self._stats_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def record(self, host: str, size: int) -> None:
+        with self._stats_lock:
+            self.requests[host] += 1
+            self.bytes_sent += size
+
+    def reset_stats(self) -> None:
+        with self._stats_lock:
+            self.requests = Counter()
+            self.bytes_sent = 0
+
+    def start(self) -> "MockServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="mock-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class MockAdapter(HTTPAdapter):
+    """Send every request to the mock server, remembering the intended host."""
+
+    def __init__(self, base_url: str, **kwargs):
+        super().__init__(**kwargs)
+        self.netloc = urlsplit(base_url).netloc
+
+    def send(self, request, **kwargs):
+        original = request.url
+        parts = urlsplit(original)
+        request.url = urlunsplit(("http", self.netloc, parts.path or "/", parts.query, ""))
+        request.headers["X-Mock-Host"] = parts.netloc
+        resp = super().send(request, **kwargs)
+        resp.url = original
+        return resp
+
+
+def route_to(base_url: str, *sessions, pool_maxsize: int = 32) -> None:
+    """Mount a ``MockAdapter`` for http and https on each session."""
+    for session in sessions:
+        adapter = MockAdapter(base_url, pool_maxsize=pool_maxsize)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
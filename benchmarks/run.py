@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+End-to-end scraper benchmarks against local mock services.
+
+    python benchmarks/run.py                              # every scenario, default sizes
+    python benchmarks/run.py ats --companies 150 --latency-ms 50
+    python benchmarks/run.py rss run_scraper --runs 2 --json results.json
+    python benchmarks/run.py ats --env ATS_WORKERS=16 --polite
+
+Scenarios:
+    ats          ats_directory_scraper.main()       (Greenhouse, Lever, Workable)
+    rss          backend/scraper.py process_feeds()  (eight RSS feeds)
+    run_scraper  backend/scraper/run_scraper.main()  (InclusivelyRemote)
+
+Every run happens in a fresh child process, so its peak RSS is its own, with
+SUPABASE_* pointed at the fake REST endpoint and every scraper session routed
+to the mock server (see mock_services.py). Nothing leaves the machine. With
+``--runs N`` later runs reuse the same mock database, which shows the warm
+path (rows already stored). Per-host pacing is switched off unless
+``--polite`` is given, so the numbers measure the pipeline, not the sleeps.
+
+Reported per run: wall time, rows written, rows/sec, requests issued (total
+and by host), bytes served and the child's peak RSS.
+"""
+
+import argparse
+import importlib
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, HERE)
+
+from mock_services import MockServer, Sizes, route_to  # noqa: E402
+
+RESULT_PREFIX = "BENCH_RESULT "
+
+SCENARIOS = {
+    "ats": "jobs",
+    "rss": "potential_jobs",
+    "run_scraper": "jobs",
+}
+
+# Pacing knobs zeroed for benchmark runs unless --polite
+UNPACED = {"ATS_SLEEP_SECONDS": "0", "IR_MIN_INTERVAL": "0"}
+
+# Local state files that would make runs depend on earlier ones, plus the
+# archive/replay and metrics-export switches. They are set to "" rather than
+# removed: the scrapers call load_dotenv(), which fills in variables that are
+# missing (from a developer's .env) but leaves ones already set alone.
+STATE_VARS = [
+    "ATS_KNOWN_IDS_CACHE", "ATS_HTTP_CACHE", "ATS_FINGERPRINTS", "ATS_CLOSED_EVENTS", "ATS_NEAR_DUP_INDEX",
+    "RSS_HTTP_CACHE", "RSS_KNOWN_IDS_CACHE", "RSS_NEAR_DUP_INDEX",
+    "IR_HTTP_CACHE", "IR_KNOWN_IDS_CACHE", "UPLOAD_NEAR_DUP_INDEX",
+    "HTTP_ARCHIVE", "HTTP_REPLAY", "HTTP_REPLAY_WRITES", "METRICS_JSON", "METRICS_PROM",
+]
+
+
+def _peak_rss_mb() -> float:
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _load_file(name: str, path: str):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_child(scenario: str, base_url: str) -> None:
+    """Import the scenario's scraper, route it to the mock server and run it."""
+    sys.path.insert(0, ROOT)
+    if scenario == "ats":
+        module = importlib.import_module("ats_directory_scraper")
+        route_to(base_url, module.SESSION)
+        target = module.main
+    elif scenario == "rss":
+        # backend/scraper.py, not the backend/scraper/ directory next to it
+        module = _load_file("rss_scraper", os.path.join(ROOT, "backend", "scraper.py"))
+        route_to(base_url, module.SESSION)
+        target = module.process_feeds
+    elif scenario == "run_scraper":
+        sys.path.insert(0, os.path.join(ROOT, "backend", "scraper"))
+        module = importlib.import_module("run_scraper")
+        route_to(base_url, importlib.import_module("inclusivelyremote").SESSION)
+        target = module.main
+    else:
+        raise SystemExit(f"unknown scenario {scenario}")
+
+    started = time.perf_counter()
+    target()
+    seconds = time.perf_counter() - started
+    print(RESULT_PREFIX + json.dumps({"seconds": seconds, "peak_rss_mb": _peak_rss_mb()}), flush=True)
+
+
+def run_scenario(server: MockServer, scenario: str, env: dict, verbose: bool) -> dict:
+    table = SCENARIOS[scenario]
+    before = server.db.inserted[table]
+    server.reset_stats()
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", scenario, "--base-url", server.url],
+        env=env, cwd=ROOT, capture_output=True, text=True,
+    )
+    if verbose or proc.returncode != 0:
+        sys.stdout.write(proc.stdout)
+        sys.stderr.write(proc.stderr)
+    if proc.returncode != 0:
+        raise SystemExit(f"{scenario} failed with exit code {proc.returncode}")
+
+    child = next(
+        json.loads(line[len(RESULT_PREFIX):])
+        for line in reversed(proc.stdout.splitlines()) if line.startswith(RESULT_PREFIX)
+    )
+    rows = server.db.inserted[table] - before
+    rest = sum(n for host, n in server.requests.items() if host.startswith("127.0.0.1"))
+    return {
+        "scenario": scenario,
+        "seconds": round(child["seconds"], 3),
+        "rows_written": rows,
+        "rows_per_sec": round(rows / child["seconds"], 1) if child["seconds"] else None,
+        "requests": sum(server.requests.values()),
+        "db_requests": rest,
+        "requests_by_host": dict(server.requests.most_common()),
+        "bytes_served": server.bytes_sent,
+        "peak_rss_mb": round(child["peak_rss_mb"], 1),
+    }
+
+
+def child_env(server: MockServer, args) -> dict:
+    env = dict(os.environ)
+    env.update(dict.fromkeys(STATE_VARS, ""))
+    env.update({
+        "SUPABASE_URL": server.url,
+        "NEXT_PUBLIC_SUPABASE_URL": server.url,
+        "SUPABASE_SERVICE_ROLE_KEY": "bench-key",
+        "ATS_MAX_COMPANIES": str(args.companies),
+        "PYTHONUNBUFFERED": "1",
+    })
+    if not args.polite:
+        env.update(UNPACED)
+    for pair in args.env:
+        key, _, value = pair.partition("=")
+        env[key] = value
+    return env
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Scraper benchmarks against local mock services.")
+    parser.add_argument("scenarios", nargs="*", metavar="scenario", help=f"any of {', '.join(SCENARIOS)} (default: all)")
+    parser.add_argument("--companies", type=int, default=40, help="companies per ATS")
+    parser.add_argument("--jobs", type=int, default=25, help="jobs per company")
+    parser.add_argument("--entries", type=int, default=100, help="entries per RSS feed")
+    parser.add_argument("--ir-pages", type=int, default=3, help="pages per InclusivelyRemote index")
+    parser.add_argument("--ir-jobs", type=int, default=20, help="jobs per InclusivelyRemote page")
+    parser.add_argument("--desc-words", type=int, default=250, help="words per job description")
+    parser.add_argument("--latency-ms", type=float, default=20, help="delay added to every response")
+    parser.add_argument("--runs", type=int, default=1, help="runs per scenario (later runs are warm)")
+    parser.add_argument("--polite", action="store_true", help="keep the scrapers' per-host pacing")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE",
+                        help="extra environment for the scraper process (repeatable)")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--verbose", action="store_true", help="show the scrapers' own output")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--base-url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.base_url)
+        return 0
+    unknown = [s for s in args.scenarios if s not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario: {', '.join(unknown)}")
+
+    sizes = Sizes(args.companies, args.jobs, args.entries, args.ir_pages, args.ir_jobs, args.desc_words)
+    server = MockServer(sizes, latency=args.latency_ms / 1000).start()
+    env = child_env(server, args)
+    results = []
+    try:
+        for scenario in args.scenarios or list(SCENARIOS):
+            for run in range(1, args.runs + 1):
+                result = run_scenario(server, scenario, env, args.verbose)
+                result["run"] = run
+                results.append(result)
+                print(
+                    f"{scenario:<12} run {run}: {result['seconds']:7.2f}s  "
+                    f"{result['rows_written']:6d} rows  {result['rows_per_sec'] or 0:8.1f} rows/s  "
+                    f"{result['requests']:6d} requests  {result['bytes_served'] / 1e6:6.1f} MB  "
+                    f"peak {result['peak_rss_mb']:.0f} MB"
+                )
+    finally:
+        server.stop()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
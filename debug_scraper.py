@@ -4,7 +4,10 @@ import re
 import traceback # Added for detailed error tracking
 from supabase import create_client, Client
 from dotenv import load_dotenv, find_dotenv
-from bs4 import BeautifulSoup 
+
+from scraping.categories import get_category
+from scraping.dedup import KnownIds
+from scraping.html_text import clean_html
 
 # --- 1. SETUP & AUTH ---
 env_file = find_dotenv('.env.local') or find_dotenv('.env')
@@ -48,15 +51,6 @@ def get_summary_safe(entry):
         return entry.content[0].get('value', '')
     return 'No description provided.'
 
-def clean_html(html_content):
-    if not html_content: return "No description"
-    if not isinstance(html_content, str): return str(html_content)
-    try:
-        soup = BeautifulSoup(html_content, "html.parser")
-        return soup.get_text(separator=" ")[:5000].strip()
-    except:
-        return str(html_content)[:5000]
-
 def get_logo_url(company_name, source_domain):
     if company_name and company_name.lower() != "unknown":
         clean_name = re.sub(r'[^a-zA-Z0-9]', '', company_name).lower()
@@ -64,18 +58,12 @@ def get_logo_url(company_name, source_domain):
             return f"https://logos.hunter.io/{clean_name}.com"
     return f"https://logos.hunter.io/{source_domain}"
 
-def get_category(title):
-    title = title.lower()
-    if any(x in title for x in ["developer", "engineer", "software", "react", "node"]): return "Development"
-    if any(x in title for x in ["design", "ui", "ux", "creative"]): return "Design"
-    if any(x in title for x in ["marketing", "seo", "sales"]): return "Marketing"
-    return "Other"
-
 # --- 4. MAIN LOOP ---
 def process_feeds():
     print("\n🚀 STARTING DEBUG SCRAPER...") 
     
     total_new_jobs = 0
+    known_ids = KnownIds(supabase, "potential_jobs")
 
     for feed_source in RSS_FEEDS:
         print(f"\n📥 Checking {feed_source['source']}...")
@@ -89,6 +77,9 @@ def process_feeds():
         new_count = 0
         skip_count = 0
 
+        # One chunked `in_` lookup per feed instead of a query per entry
+        known_ids.check_many(getattr(e, 'id', getattr(e, 'link', '')) for e in feed.entries)
+
         for i, entry in enumerate(feed.entries): 
             try:
                 # print(f"Processing item {i+1}...", end="\r") # Progress indicator
@@ -97,10 +88,8 @@ def process_feeds():
                 link = getattr(entry, 'link', '')
                 external_id = getattr(entry, 'id', link)
                 
-                # Check Duplicates
-                existing = supabase.table("potential_jobs").select("external_id").eq("external_id", external_id).execute()
-                
-                if existing.data:
+                # Check Duplicates (answered from memory, see check_many above)
+                if external_id in known_ids:
                     skip_count += 1
                     continue 
 
@@ -127,6 +116,7 @@ def process_feeds():
 
                 # Attempt Insert
                 supabase.table("potential_jobs").insert(job_data).execute()
+                known_ids.add(external_id)
                 
                 new_count += 1
                 total_new_jobs += 1
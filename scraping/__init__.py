@@ -0,0 +1,6 @@
+"""
+Shared building blocks for the Remote Job Bay scrapers.
+
+The scripts at the repo root (``ats_directory_scraper.py``, ``debug_scraper.py``)
+and under ``backend/`` import from here instead of carrying their own copies.
+"""
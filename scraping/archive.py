@@ -0,0 +1,189 @@
+"""
+Content-addressed archive of raw HTTP responses, and offline replay.
+
+A ``PoliteSession`` given a ``ResponseArchive`` stores the body of every
+successful GET (and HEAD) under the SHA-256 of its bytes, zstd-compressed
+when the ``zstandard`` package is installed and gzipped otherwise, so a page
+fetched again unchanged costs no extra space. ``index.jsonl`` maps each request (method and
+full URL) to the latest body, status and a few headers. In replay mode the
+session answers every request from the archive instead of the network, so
+the normal parse/normalize/filter pipeline can be re-run offline at CPU
+speed -- after a parser fix, or as a fixed corpus for benchmarks.
+
+    HTTP_ARCHIVE=archive/ python ats_directory_scraper.py                 # record
+    HTTP_ARCHIVE=archive/ HTTP_REPLAY=1 python ats_directory_scraper.py   # replay
+    python -m scraping.archive archive/                                   # stats
+
+A recording run ignores stored HTTP validators so every page comes back in
+full and gets archived. A replay writes nothing to the database unless
+HTTP_REPLAY_WRITES=1 as well (see ``dry_run_from_env``).
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+try:
+    import zstandard
+except ImportError:  # optional; gzip is always available
+    zstandard = None
+
+KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+def request_key(method: str, url: str, params=None) -> str:
+    """Archive key for a request: method plus the URL as requests would send it."""
+    if params:
+        url = requests.Request(method, url, params=params).prepare().url
+    return f"{method.upper()} {url}"
+
+
+class ResponseArchive:
+    def __init__(self, root: str):
+        self.root = root
+        self.objects = os.path.join(root, "objects")
+        os.makedirs(self.objects, exist_ok=True)
+        self.index_path = os.path.join(root, "index.jsonl")
+        self._entries: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self.recorded = 0       # responses recorded this run
+        self.new_objects = 0    # of those, bodies not already stored
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line from an interrupted run
+                    self._entries[entry["key"]] = entry
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _object_path(self, digest: str, ext: str) -> str:
+        return os.path.join(self.objects, digest[:2], f"{digest[2:]}.{ext}")
+
+    def _find_object(self, digest: str) -> Optional[str]:
+        for ext in ("zst", "gz"):
+            path = self._object_path(digest, ext)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def put_body(self, body: bytes) -> str:
+        """Store `body` (if new) and return its SHA-256."""
+        digest = hashlib.sha256(body).hexdigest()
+        if self._find_object(digest):
+            return digest
+        if zstandard is not None:
+            path, data = self._object_path(digest, "zst"), zstandard.ZstdCompressor(level=10).compress(body)
+        else:
+            path, data = self._object_path(digest, "gz"), gzip.compress(body, compresslevel=6, mtime=0)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        with self._lock:
+            self.new_objects += 1
+        return digest
+
+    def get_body(self, digest: str) -> bytes:
+        path = self._find_object(digest)
+        if path is None:
+            raise FileNotFoundError(f"archive object {digest} is missing")
+        with open(path, "rb") as f:
+            data = f.read()
+        if path.endswith(".gz"):
+            return gzip.decompress(data)
+        if zstandard is None:
+            raise RuntimeError(f"{path} is zstd-compressed; install zstandard to read it")
+        return zstandard.ZstdDecompressor().decompress(data)
+
+    def record(self, key: str, resp) -> None:
+        """Archive a 2xx response under `key`; other statuses are left alone."""
+        if not 200 <= resp.status_code < 300:
+            return
+        body = resp.content
+        entry = {
+            "key": key,
+            "sha256": self.put_body(body),
+            "size": len(body),
+            "status": resp.status_code,
+            "url": resp.url,
+            "headers": {h: resp.headers[h] for h in KEPT_HEADERS if h in resp.headers},
+            "fetched_at": time.time(),
+        }
+        line = json.dumps(entry) + "\n"
+        with self._lock:
+            self._entries[key] = entry
+            self.recorded += 1
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+    def replay(self, key: str):
+        """The archived response for `key`; raises ConnectionError if there is none."""
+        entry = self._entries.get(key)
+        if entry is None:
+            raise requests.ConnectionError(f"not in archive: {key}")
+        resp = requests.Response()
+        resp.status_code = entry["status"]
+        resp.reason = "OK"
+        resp.url = entry["url"]
+        resp.headers = CaseInsensitiveDict(entry["headers"])
+        resp.encoding = get_encoding_from_headers(resp.headers)
+        resp._content = self.get_body(entry["sha256"])
+        resp._content_consumed = True
+        return resp
+
+
+def _flag(name: str) -> bool:
+    return os.environ.get(name, "").lower() in ("1", "true", "yes")
+
+
+def archive_from_env():
+    """
+    ``(archive, replay)`` from HTTP_ARCHIVE (a directory) and HTTP_REPLAY;
+    ``(None, False)`` when archiving is off.
+    """
+    root = os.environ.get("HTTP_ARCHIVE")
+    if not root:
+        return None, False
+    return ResponseArchive(root), _flag("HTTP_REPLAY")
+
+
+def dry_run_from_env() -> bool:
+    """
+    True while replaying an archive unless HTTP_REPLAY_WRITES is set: a
+    replay re-runs the pipeline over old pages, and its rows shouldn't reach
+    the database (or local caches mirroring it) by accident.
+    """
+    return bool(os.environ.get("HTTP_ARCHIVE")) and _flag("HTTP_REPLAY") and not _flag("HTTP_REPLAY_WRITES")
+
+
+def main(argv) -> int:
+    if len(argv) != 1:
+        print("usage: python -m scraping.archive ARCHIVE_DIR")
+        return 2
+    archive = ResponseArchive(argv[0])
+    digests = {entry["sha256"]: entry["size"] for entry in archive._entries.values()}
+    stored = 0
+    for dirpath, _, files in os.walk(archive.objects):
+        stored += sum(os.path.getsize(os.path.join(dirpath, name)) for name in files)
+    raw = sum(digests.values())
+    print(f"{len(archive)} requests, {len(digests)} distinct bodies")
+    print(f"{raw / 1e6:.1f} MB raw, {stored / 1e6:.1f} MB on disk ({'zstd' if zstandard else 'gzip'})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
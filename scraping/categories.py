@@ -0,0 +1,73 @@
+"""
+Job-title categorizer shared by every scraper.
+
+The taxonomy is an ordered list of ``(category, keywords)``; the first
+category with any keyword in the title wins, otherwise ``default``. All
+keywords are compiled into one regex once. Matching is word-boundary aware:
+a keyword must start at a word boundary (so "ui" no longer matches "build"),
+and keywords of three letters or fewer must also end on one (so "seo" doesn't
+match "seoul"), while longer ones still match inflections like "designer".
+Results are memoized per title with an LRU cache.
+"""
+
+import re
+from functools import lru_cache
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+Taxonomy = Sequence[Tuple[str, Sequence[str]]]
+
+DEFAULT_TAXONOMY: Taxonomy = [
+    ("Development", ["developer", "engineer", "software", "react", "node", "python"]),
+    ("Design", ["design", "ui", "ux", "artist", "creative"]),
+    ("Marketing", ["marketing", "seo", "sales", "growth"]),
+]
+
+
+def _keyword_pattern(keyword: str) -> str:
+    keyword = keyword.lower()
+    pattern = r"(?<![a-z0-9])" + re.escape(keyword)
+    if len(keyword) <= 3:
+        pattern += r"(?![a-z0-9])"
+    return pattern
+
+
+class Categorizer:
+    def __init__(self, taxonomy: Taxonomy = DEFAULT_TAXONOMY, default: str = "Other", cache_size: int = 65536):
+        self.names = [name for name, _ in taxonomy]
+        self.default = default
+        groups = []
+        for i, (_, keywords) in enumerate(taxonomy):
+            alternatives = "|".join(_keyword_pattern(k) for k in sorted(keywords, key=len, reverse=True))
+            groups.append(f"(?P<c{i}>{alternatives})")
+        self._regex = re.compile("|".join(groups)) if groups else None
+        self._cached = lru_cache(maxsize=cache_size)(self._classify)
+
+    def _classify(self, title: str) -> str:
+        best: Optional[int] = None
+        if self._regex is not None:
+            for m in self._regex.finditer(title.lower()):
+                rank = int(m.lastgroup[1:])
+                if best is None or rank < best:
+                    best = rank
+                    if rank == 0:
+                        break
+        return self.default if best is None else self.names[best]
+
+    def category(self, title) -> str:
+        return self._cached(title or "")
+
+    def categorize(self, titles: Iterable) -> List[str]:
+        """Categorize many titles; repeated titles are only matched once."""
+        cached = self._cached
+        return [cached(t or "") for t in titles]
+
+
+CATEGORIZER = Categorizer()
+
+
+def get_category(title) -> str:
+    return CATEGORIZER.category(title)
+
+
+def categorize(titles: Iterable) -> List[str]:
+    return CATEGORIZER.categorize(titles)
@@ -0,0 +1,111 @@
+"""
+Set-based duplicate checks against a Supabase table.
+
+Instead of one ``select ... eq("external_id", ...)`` round trip per job,
+``KnownIds`` either loads every id under a prefix once (e.g. ``"greenhouse:"``)
+or checks a batch of candidates in chunks with an ``in_`` filter, and then
+answers membership from memory. The set can optionally be persisted to a
+local file so ids seen on a previous run never hit the network again.
+"""
+
+import os
+from typing import Iterable, Optional, Set
+
+PAGE_SIZE = 1000  # rows per paged select when prefetching
+IN_CHUNK = 100    # ids per `in_` filter (keeps the query string short)
+
+
+class KnownIds:
+    def __init__(
+        self,
+        client,
+        table: str,
+        column: str = "external_id",
+        cache_path: Optional[str] = None,
+    ):
+        self.client = client
+        self.table = table
+        self.column = column
+        self.cache_path = cache_path
+        self._ids: Set[str] = set()
+        self._prefixes: Set[str] = set()
+        if cache_path:
+            self.load()
+
+    def __contains__(self, external_id) -> bool:
+        return str(external_id) in self._ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, external_id) -> None:
+        """Record an id we just inserted."""
+        self._ids.add(str(external_id))
+
+    def covers(self, external_id) -> bool:
+        """True if membership for this id is already authoritative in memory."""
+        external_id = str(external_id)
+        # `prefetch` may add a prefix from another thread while we look
+        return external_id in self._ids or any(external_id.startswith(p) for p in tuple(self._prefixes))
+
+    def prefetch(self, prefix: str = "") -> int:
+        """Load every stored id starting with `prefix`. Returns rows read."""
+        read = 0
+        start = 0
+        try:
+            while True:
+                query = self.client.table(self.table).select(self.column)
+                if prefix:
+                    query = query.like(self.column, f"{prefix}%")
+                rows = query.range(start, start + PAGE_SIZE - 1).execute().data or []
+                for row in rows:
+                    self._ids.add(str(row[self.column]))
+                read += len(rows)
+                if len(rows) < PAGE_SIZE:
+                    break
+                start += PAGE_SIZE
+        except Exception as e:
+            print(f"  - Could not prefetch {self.table} ids ({prefix or 'all'}): {e}")
+            return read
+        self._prefixes.add(prefix)
+        return read
+
+    def check_many(self, external_ids: Iterable) -> Set[str]:
+        """
+        Resolve membership for a batch of ids, querying only the ones memory
+        can't answer, and return the subset that already exists.
+        """
+        ids = {str(i) for i in external_ids if i}
+        pending = [i for i in ids if not self.covers(i)]
+        for n in range(0, len(pending), IN_CHUNK):
+            chunk = pending[n:n + IN_CHUNK]
+            try:
+                rows = (
+                    self.client.table(self.table)
+                    .select(self.column)
+                    .in_(self.column, chunk)
+                    .execute()
+                    .data
+                    or []
+                )
+            except Exception as e:
+                print(f"  - Duplicate check failed for {len(chunk)} ids: {e}")
+                continue
+            for row in rows:
+                self._ids.add(str(row[self.column]))
+        return ids & self._ids
+
+    def load(self) -> None:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        with open(self.cache_path, "r", encoding="utf-8") as f:
+            self._ids.update(line.rstrip("\n") for line in f if line.strip())
+
+    def save(self) -> None:
+        if not self.cache_path:
+            return
+        tmp = f"{self.cache_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for external_id in sorted(self._ids):
+                f.write(f"{external_id}\n")
+        os.replace(tmp, self.cache_path)
@@ -0,0 +1,82 @@
+"""
+Per-board change detection between scraper runs.
+
+``BoardFingerprints`` remembers, for every board (e.g. ``"lever:acme"``), the
+ids of the jobs it has handled and a short hash of each raw job. Diffing
+the current listing against it tells us which jobs are new, which changed,
+and which disappeared, so steady-state runs only do work proportional to
+churn. Callers ``record`` a job once its row is written or filtered out.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, NamedTuple, Optional
+
+
+class BoardDiff(NamedTuple):
+    new: List[str]
+    changed: List[str]
+    closed: List[str]
+
+
+def item_hash(raw) -> str:
+    """Stable short hash of a raw (JSON-able) job payload."""
+    blob = json.dumps(raw, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()[:16]
+
+
+class BoardFingerprints:
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._boards: Dict[str, Dict[str, str]] = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self._boards = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"  - Ignoring unreadable fingerprint file {path}: {e}")
+
+    def diff(self, board: str, current: Dict[str, str]) -> BoardDiff:
+        """
+        Compare `current` (job id -> item hash) with the recorded baseline for
+        `board`. Closed ids leave the baseline straight away; new and changed
+        ones only enter it through ``record``, once they have been handled,
+        so a job that is never written shows up as new again next run.
+        """
+        with self._lock:
+            previous = self._boards.get(board, {})
+            closed = [i for i in previous if i not in current]
+            new = [i for i in current if i not in previous]
+            changed = [i for i, h in current.items() if i in previous and previous[i] != h]
+            if closed:
+                self._boards[board] = {i: h for i, h in previous.items() if i in current}
+        return BoardDiff(new, changed, closed)
+
+    def record(self, board: str, job_id: str, item_hash: str) -> None:
+        """Mark one job as handled (written, updated or deliberately filtered)."""
+        with self._lock:
+            self._boards.setdefault(board, {})[job_id] = item_hash
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        with self._lock:
+            data = json.dumps(self._boards, separators=(",", ":"))
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp, self.path)
+
+
+def append_closed_events(path: str, external_ids: List[str]) -> None:
+    """Append one JSON line per closed posting to `path`."""
+    if not path or not external_ids:
+        return
+    at = datetime.now(timezone.utc).isoformat()
+    with open(path, "a", encoding="utf-8") as f:
+        for external_id in external_ids:
+            f.write(json.dumps({"event": "closed", "external_id": external_id, "at": at}) + "\n")
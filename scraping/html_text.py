@@ -0,0 +1,184 @@
+"""
+Fast HTML-to-text for job descriptions.
+
+``clean_html`` keeps the contract of the old BeautifulSoup version
+(``get_text(separator=" ")[:5000].strip()``) but:
+
+* input without tags or entities is returned without parsing at all
+  (Lever's ``descriptionPlain``, for one);
+* markup goes through a streaming ``HTMLParser`` that is fed in chunks and
+  stops as soon as enough text has been produced, instead of building a
+  whole tree first;
+* results are memoized by a hash of the input, so the same description seen
+  through several feeds or runs is only stripped once per process.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from html.entities import name2codepoint
+from html.parser import HTMLParser
+from typing import List
+
+from scraping.metrics import METRICS
+
+MAX_CHARS = 5000
+FEED_CHUNK = 4096
+CACHE_SIZE = 4096
+
+# Tags whose contents BeautifulSoup's get_text() leaves out
+_SKIP_TAGS = {"script", "style", "template"}
+# Tags inside which whitespace-only strings are kept verbatim
+_PRESERVE_TAGS = {"pre", "textarea"}
+_ASCII_SPACES = "\x20\x0a\x09\x0c\x0d"
+_VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "keygen", "link", "menuitem",
+    "meta", "param", "source", "track", "wbr", "basefont", "bgsound", "command", "frame",
+    "image", "isindex", "nextid", "spacer",
+}
+
+
+class _TextExtractor(HTMLParser):
+    # Mirrors how bs4's html.parser builder forms strings: adjacent data is
+    # merged, whitespace-only runs collapse to "\n" or " ", CDATA counts as
+    # text, script/style contents don't, and character references are
+    # resolved the same way (unknown "&name" is left as-is).
+    def __init__(self, limit: int):
+        super().__init__(convert_charrefs=False)
+        self.limit = limit
+        self.pieces: List[str] = []
+        self.length = 0
+        self._current: List[str] = []
+        self._stack: List[str] = []  # open elements, like bs4's tag stack
+        self._skip_depth = 0
+        self._preserve_depth = 0
+
+    @property
+    def full(self) -> bool:
+        return self.length >= self.limit
+
+    def flush(self):
+        if not self._current:
+            return
+        data = "".join(self._current)
+        self._current = []
+        if self._skip_depth:
+            return
+        if not self._preserve_depth and not data.strip(_ASCII_SPACES):
+            data = "\n" if "\n" in data else " "
+        self._append(data)
+
+    def _append(self, data):
+        self.pieces.append(data)
+        self.length += len(data) + 1  # + separator
+
+    def _push(self, tag):
+        self._stack.append(tag)
+        self._skip_depth += tag in _SKIP_TAGS
+        self._preserve_depth += tag in _PRESERVE_TAGS
+
+    def _pop(self):
+        tag = self._stack.pop()
+        self._skip_depth -= tag in _SKIP_TAGS
+        self._preserve_depth -= tag in _PRESERVE_TAGS
+
+    def handle_starttag(self, tag, attrs):
+        self.flush()
+        if tag not in _VOID_TAGS:
+            self._push(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.flush()
+
+    def handle_endtag(self, tag):
+        self.flush()
+        # Closing a tag closes everything opened inside it; stray end tags are ignored
+        if tag in self._stack:
+            while self._stack[-1] != tag:
+                self._pop()
+            self._pop()
+
+    def handle_data(self, data):
+        self._current.append(data)
+
+    def handle_entityref(self, name):
+        codepoint = name2codepoint.get(name)
+        self._current.append(chr(codepoint) if codepoint is not None else f"&{name}")
+
+    def handle_charref(self, name):
+        try:
+            number = int(name[1:], 16) if name[:1] in ("x", "X") else int(name)
+        except ValueError:
+            self._current.append(f"&#{name};")
+            return
+        data = None
+        if number < 256:
+            # Numeric references below 256 are often meant as windows-1252
+            try:
+                data = bytes([number]).decode("windows-1252")
+            except UnicodeDecodeError:
+                pass
+        if not data:
+            try:
+                data = chr(number)
+            except (ValueError, OverflowError):
+                pass
+        self._current.append(data or "\N{REPLACEMENT CHARACTER}")
+
+    def handle_comment(self, data):
+        self.flush()
+
+    def handle_decl(self, decl):
+        self.flush()
+
+    def handle_pi(self, data):
+        self.flush()
+
+    def unknown_decl(self, data):
+        self.flush()
+        if data.upper().startswith("CDATA[") and not self._skip_depth:
+            self._append(data[len("CDATA["):])
+
+
+def _extract(markup: str, limit: int) -> str:
+    if "<" not in markup and "&" not in markup:
+        return markup[:limit].strip()
+
+    parser = _TextExtractor(limit)
+    for start in range(0, len(markup), FEED_CHUNK):
+        parser.feed(markup[start:start + FEED_CHUNK])
+        if parser.full:
+            break
+    else:
+        parser.close()
+    parser.flush()
+    return " ".join(parser.pieces)[:limit].strip()
+
+
+_cache: "OrderedDict[bytes, str]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+@METRICS.timed("clean_html_seconds")
+def clean_html(html_content, limit: int = MAX_CHARS) -> str:
+    if not html_content:
+        return "No description"
+    if not isinstance(html_content, str):
+        return str(html_content)
+
+    key = hashlib.blake2b(html_content.encode("utf-8", "surrogatepass"), digest_size=16).digest() + limit.to_bytes(4, "big")
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    try:
+        text = _extract(html_content, limit)
+    except Exception:
+        text = html_content[:limit]
+
+    with _cache_lock:
+        _cache[key] = text
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return text
@@ -0,0 +1,122 @@
+"""
+Persistent HTTP validator cache for conditional GETs.
+
+For every URL we remember the ``ETag``, ``Last-Modified`` and a SHA-256 of the
+body. The next request sends ``If-None-Match`` / ``If-Modified-Since``; a 304,
+or a 200 whose body hashes the same as last time, is reported as *unchanged*
+so callers can skip parsing it. Callers may also stash a small JSON-able
+result derived from the body (``set_derived``) and reuse it while the
+resource stays unchanged.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlencode
+
+
+def cache_key(url: str, params: Optional[Dict] = None) -> str:
+    if not params:
+        return url
+    sep = "&" if "?" in url else "?"
+    return f"{url}{sep}{urlencode(sorted(params.items()))}"
+
+
+class ValidatorCache:
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"  - Ignoring unreadable HTTP cache {path}: {e}")
+
+    def validators(self, key: str) -> Dict[str, str]:
+        """Conditional request headers for a cached URL."""
+        entry = self._entries.get(key) or {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def record(self, key: str, resp) -> bool:
+        """Store validators for a 2xx response. Returns True if the body is unchanged."""
+        digest = hashlib.sha256(resp.content or b"").hexdigest()
+        with self._lock:
+            previous = self._entries.get(key) or {}
+            unchanged = previous.get("sha256") == digest
+            entry = {
+                "etag": resp.headers.get("ETag"),
+                "last_modified": resp.headers.get("Last-Modified"),
+                "sha256": digest,
+            }
+            if unchanged and "derived" in previous:
+                entry["derived"] = previous["derived"]
+            self._entries[key] = entry
+        return unchanged
+
+    def forget(self, key: str) -> None:
+        """Drop `key`, so the next run fetches and processes it in full."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def get_derived(self, key: str) -> Any:
+        return (self._entries.get(key) or {}).get("derived")
+
+    def set_derived(self, key: str, value: Any) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._entries[key]["derived"] = value
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        with self._lock:
+            data = json.dumps(self._entries)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp, self.path)
+
+
+def conditional_get(
+    session,
+    url: str,
+    cache: Optional[ValidatorCache] = None,
+    params: Optional[Dict] = None,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: float = 20,
+) -> Tuple[Any, bool]:
+    """
+    GET `url` with conditional headers from `cache`.
+    Returns ``(response, unchanged)``; exceptions from `session` propagate.
+    A session recording or replaying an archive always gets the full body, so
+    everything is archived and reprocessed; a recording still refreshes the
+    validators.
+    """
+    if cache is None or getattr(session, "replaying", False):
+        return session.get(url, params=params, headers=headers, timeout=timeout), False
+
+    key = cache_key(url, params)
+    if getattr(session, "archive", None) is not None:
+        # A 304 has no body to archive, so don't ask for one
+        resp = session.get(url, params=params, headers=headers, timeout=timeout)
+        if 200 <= resp.status_code < 300:
+            cache.record(key, resp)
+        return resp, False
+
+    request_headers = dict(headers or {})
+    request_headers.update(cache.validators(key))
+    resp = session.get(url, params=params, headers=request_headers, timeout=timeout)
+    if resp.status_code == 304:
+        return resp, True
+    if resp.status_code >= 400:
+        return resp, False
+    return resp, cache.record(key, resp)
@@ -0,0 +1,186 @@
+"""
+A ``requests.Session`` that paces, retries and circuit-breaks per host.
+
+Every request made through a ``PoliteSession`` -- including those made by
+helpers such as ``conditional_get`` -- first waits for a slot in its host's
+``TokenBucket``. GET and HEAD requests that hit a connection error or a
+429/502/503/504 are retried up to ``max_retries`` times, sleeping for the
+``Retry-After`` the server asked for or else an exponential backoff with
+full jitter; throttling responses also slow the host down for every thread.
+A host whose requests keep failing even after retries has its
+``CircuitBreaker`` opened, and requests to it raise ``HostUnavailable``
+straight away until the cooldown passes. Other responses (including 4xx)
+are returned as-is, so callers keep deciding what a status means.
+
+With an ``archive`` the session records successful GETs and HEADs into it; with
+``replay=True`` as well, it serves requests from the archive instead and
+never touches the network (see ``scraping.archive``).
+
+Each attempt is recorded in ``scraping.metrics.METRICS``: latency, status
+and bytes on the wire per host, plus retries and requests refused by an open
+circuit.
+"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+
+from scraping.archive import ResponseArchive, request_key
+from scraping.metrics import METRICS
+from scraping.ratelimit import CircuitBreaker, TokenBucket
+
+RETRY_STATUSES = {429, 502, 503, 504}
+THROTTLE_STATUSES = {429, 503}
+RETRY_METHODS = {"GET", "HEAD"}
+
+
+class HostUnavailable(requests.ConnectionError):
+    """Raised instead of sending a request to a host whose circuit is open."""
+
+
+def retry_after(resp) -> Optional[float]:
+    """Seconds from a Retry-After header (delta-seconds or HTTP date), if any."""
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+class PoliteSession(requests.Session):
+    def __init__(
+        self,
+        interval: float = 0.0,
+        burst: int = 1,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 60.0,
+        failure_threshold: int = 5,
+        cooldown: float = 60.0,
+        archive: Optional[ResponseArchive] = None,
+        replay: bool = False,
+    ):
+        super().__init__()
+        self.interval = interval
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.archive = archive
+        self.replaying = replay and archive is not None
+        self._hosts: Dict[str, Tuple[TokenBucket, CircuitBreaker]] = {}
+        self._hosts_lock = threading.Lock()
+
+    def host(self, url: str) -> Tuple[TokenBucket, CircuitBreaker]:
+        netloc = urlparse(url).netloc
+        with self._hosts_lock:
+            state = self._hosts.get(netloc)
+            if state is None:
+                state = self._hosts[netloc] = (
+                    TokenBucket(self.interval, self.burst),
+                    CircuitBreaker(self.failure_threshold, self.cooldown),
+                )
+            return state
+
+    def _delay(self, attempt: int, resp=None) -> float:
+        asked = retry_after(resp) if resp is not None else None
+        if asked is not None:
+            return min(asked, self.max_backoff)
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def request(self, method, url, *args, **kwargs):
+        if self.archive is None:
+            return self._request(method, url, *args, **kwargs)
+        key = request_key(method, url, kwargs.get("params"))
+        if self.replaying:
+            resp = self.archive.replay(key)
+            METRICS.inc("http_requests_total", host=urlparse(url).netloc, status="archive")
+            return resp
+        resp = self._request(method, url, *args, **kwargs)
+        if method.upper() in ("GET", "HEAD"):
+            self.archive.record(key, resp)
+        return resp
+
+    def _request(self, method, url, *args, **kwargs):
+        bucket, breaker = self.host(url)
+        netloc = urlparse(url).netloc
+        retryable = method.upper() in RETRY_METHODS
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                METRICS.inc("http_rejected_total", host=netloc)
+                raise HostUnavailable(f"{netloc} is failing, not contacting it for now")
+            bucket.wait()
+            if attempt:
+                METRICS.inc("http_retries_total", host=netloc)
+            started = time.perf_counter()
+            try:
+                resp = super().request(method, url, *args, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                METRICS.observe("http_request_seconds", time.perf_counter() - started, host=netloc)
+                METRICS.inc("http_requests_total", host=netloc, status="error")
+                if not retryable or attempt >= self.max_retries:
+                    self._failed(url, breaker)
+                    raise
+                time.sleep(self._delay(attempt))
+                attempt += 1
+                continue
+            self._record(netloc, resp, time.perf_counter() - started, kwargs.get("stream"))
+
+            if resp.status_code not in RETRY_STATUSES:
+                breaker.success()
+                bucket.speed_up()
+                return resp
+
+            throttled = resp.status_code in THROTTLE_STATUSES
+            if throttled:
+                bucket.slow_down()
+            if not retryable or attempt >= self.max_retries:
+                self._failed(url, breaker)
+                return resp
+            delay = self._delay(attempt, resp)
+            resp.close()
+            if throttled:
+                bucket.pause(delay)   # every thread waits, not just this one
+            else:
+                time.sleep(delay)
+            attempt += 1
+
+    @staticmethod
+    def _wire_bytes(resp, stream) -> int:
+        """Body bytes as received, before any Content-Encoding was undone."""
+        # urllib3 counts what it read off the socket; a streamed body hasn't
+        # been read yet, so trust its Content-Length (also the encoded size)
+        if not stream:
+            try:
+                return int(resp.raw.tell())
+            except (AttributeError, TypeError, ValueError):
+                pass
+        try:
+            return int(resp.headers.get("Content-Length", 0))
+        except ValueError:
+            return 0
+
+    @classmethod
+    def _record(cls, netloc: str, resp, seconds: float, stream) -> None:
+        METRICS.observe("http_request_seconds", seconds, host=netloc)
+        METRICS.inc("http_requests_total", host=netloc, status=resp.status_code)
+        METRICS.inc("http_bytes_total", cls._wire_bytes(resp, stream), host=netloc)
+
+    def _failed(self, url: str, breaker: CircuitBreaker) -> None:
+        if breaker.failure():
+            print(f"  - {urlparse(url).netloc}: {breaker.threshold} failures in a row, "
+                  f"pausing it for {breaker.cooldown:g}s")
@@ -0,0 +1,145 @@
+"""
+Cached, concurrent resolution of job-board URLs to final apply URLs.
+
+``LinkResolver`` wraps a board-specific ``extract(html, source)`` function: it
+downloads the board page, asks ``extract`` for the apply link and, when that
+link goes through a known redirector, follows the redirect chain with one
+HEAD request. Results live in a ``LinkCache`` -- board URL to final URL and
+every redirect hop to where it ends -- with a TTL, optionally persisted to a
+JSON file, so a posting or a redirect is resolved once and then reused,
+within a run and across runs. ``resolve_many`` works through a batch on a
+thread pool; pass a ``PoliteSession`` to keep requests to each domain
+paced.
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+DEFAULT_TTL = 7 * 24 * 3600  # seconds
+
+
+class LinkCache:
+    def __init__(self, path: Optional[str] = None, ttl: float = DEFAULT_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._entries: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self._entries = {url: (final, ts) for url, (final, ts) in json.load(f).items()}
+            except (OSError, ValueError, TypeError) as e:
+                print(f"  - Ignoring unreadable link cache {path}: {e}")
+
+    def get(self, url: str) -> Optional[str]:
+        entry = self._entries.get(url)
+        if entry is None or time.time() - entry[1] > self.ttl:
+            return None
+        return entry[0]
+
+    def set(self, url: str, final: str) -> None:
+        with self._lock:
+            self._entries[url] = (final, time.time())
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        now = time.time()
+        with self._lock:
+            fresh = {url: entry for url, entry in self._entries.items() if now - entry[1] <= self.ttl}
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(fresh, f)
+        os.replace(tmp, self.path)
+
+
+class LinkResolver:
+    def __init__(
+        self,
+        extract: Callable[[bytes, str], Optional[str]],
+        session,
+        cache: Optional[LinkCache] = None,
+        redirectors: Sequence[str] = (),
+        workers: int = 4,
+        timeout: float = 10,
+    ):
+        self.extract = extract
+        self.session = session
+        self.cache = cache or LinkCache()
+        self.redirectors = tuple(redirectors)
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def _once(self, key: str, compute: Callable[[], str]) -> str:
+        # Threads asking for the same URL at the same time share one request
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+        if not owner:
+            return future.result()
+        try:
+            value = compute()
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def follow(self, url: str) -> str:
+        """Final URL of a redirect chain; every hop is cached."""
+        cached = self.cache.get(url)
+        if cached:
+            return cached
+
+        def compute() -> str:
+            resp = self.session.head(url, allow_redirects=True, timeout=self.timeout)
+            final = resp.url
+            for hop in resp.history:
+                self.cache.set(hop.url, final)
+            self.cache.set(url, final)
+            return final
+
+        return self._once(f"follow:{url}", compute)
+
+    def resolve(self, url: str, source: str) -> str:
+        """
+        Direct apply URL for a board posting. Falls back to `url` itself if
+        the page can't be fetched (not cached, so it's retried next run).
+        """
+        cached = self.cache.get(url)
+        if cached:
+            return cached
+
+        def compute() -> str:
+            resp = self.session.get(url, timeout=self.timeout)
+            resp.raise_for_status()
+            direct = self.extract(resp.content, source)
+            if direct and any(r in direct for r in self.redirectors):
+                direct = self.follow(direct)
+            final = direct or url
+            self.cache.set(url, final)
+            return final
+
+        try:
+            return self._once(f"resolve:{url}", compute)
+        except Exception as e:
+            print(f"      ⚠️ Could not resolve link {url}: {e}")
+            return url
+
+    def resolve_many(self, items: Iterable[Tuple[str, str]]) -> Dict[str, str]:
+        """Resolve (url, source) pairs concurrently. Returns {url: final_url}."""
+        unique = list(dict.fromkeys(items))
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            finals = pool.map(lambda item: self.resolve(*item), unique)
+            return {url: final for (url, _), final in zip(unique, finals)}
@@ -0,0 +1,289 @@
+"""
+Run metrics for the scrapers: labelled counters and latency histograms.
+
+Everything records into the process-wide ``METRICS`` registry:
+
+* ``http_requests_total{host,status}``, ``http_request_seconds{host}``,
+  ``http_bytes_total{host}`` (bytes on the wire, before decompression),
+  ``http_retries_total{host}`` and ``http_rejected_total{host}`` from
+  ``PoliteSession``;
+* ``stage_seconds{stage,source}`` for discover / fetch / normalize / handle
+  in the source orchestrator and each scraper's per-source steps (the
+  remote filter, duplicate checks...);
+* ``upload_seconds`` for ``BatchWriter`` sink calls and
+  ``clean_html_seconds``, which aren't split by source;
+* ``jobs_total{source,outcome}`` for rows scraped, filtered, already known,
+  duplicated and queued, and ``rows_written_total{outcome}`` for the writes.
+
+Every series of a metric carries the same labels, so sums over one label
+(e.g. ``jobs_total`` by outcome) never mix in a differently-labelled total.
+
+Recording is a dict update under a lock, cheap enough for per-job calls. A
+process pool worker records into its own copy of the registry; ``take`` and
+``merge`` carry those numbers back to the parent. At
+the end of a run ``export`` writes a JSON report and/or a Prometheus text
+file (e.g. for node_exporter's textfile collector); ``export_from_env`` takes
+the paths from METRICS_JSON and METRICS_PROM.
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Dict, List, Optional, Tuple
+
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, math.inf)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    __slots__ = ("counts", "count", "sum", "max")
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "Histogram") -> None:
+        for i, n in enumerate(other.counts):
+            self.counts[i] += n
+        self.count += other.count
+        self.sum += other.sum
+        if other.max > self.max:
+            self.max = other.max
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation (max for the last bucket)."""
+        target = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS, self.counts):
+            seen += n
+            if n and seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+
+def _key(labels: Dict[str, object]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _prom_labels(labels: Labels, extra: str = "") -> str:
+    parts = ['%s="%s"' % (k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")) for k, v in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Stopwatch:
+    """Adds up the time spent inside each ``with`` block (see ``Metrics.accumulate``)."""
+    __slots__ = ("seconds", "_started")
+
+    def __init__(self):
+        self.seconds = 0.0
+        self._started = 0.0
+
+    def __enter__(self) -> "Stopwatch":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.seconds += time.perf_counter() - self._started
+
+
+class Metrics:
+    def __init__(self, prefix: str = "scraper"):
+        self.prefix = prefix
+        self.started = time.time()
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        key = _key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = _key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = Histogram()
+            hist.observe(value)
+
+    @contextmanager
+    def timing(self, name: str, **labels):
+        """Time a block into histogram `name`."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def timer(self, stage: str, source: str):
+        """Time a block into ``stage_seconds{stage,source}``."""
+        return self.timing("stage_seconds", stage=stage, source=source)
+
+    @contextmanager
+    def accumulate(self, stage: str, source: str):
+        """
+        Yield a ``Stopwatch`` for timing many small blocks (one per job, say)
+        with ``with watch:``; their total goes into ``stage_seconds`` once,
+        when this block ends.
+        """
+        watch = Stopwatch()
+        try:
+            yield watch
+        finally:
+            self.observe("stage_seconds", watch.seconds, stage=stage, source=source)
+
+    def timed(self, name: str):
+        """Decorator timing every call into the unlabelled histogram `name`."""
+        def decorate(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.observe(name, time.perf_counter() - started)
+            return wrapper
+        return decorate
+
+    def jobs(self, source: str, **outcomes: int) -> None:
+        """Add to ``jobs_total{source,outcome}`` for every non-zero outcome."""
+        for outcome, n in outcomes.items():
+            if n:
+                self.inc("jobs_total", n, source=source, outcome=outcome)
+
+    def counter(self, name: str, **labels) -> float:
+        with self._lock:
+            return self._counters.get(name, {}).get(_key(labels), 0)
+
+    def take(self) -> dict:
+        """
+        Remove and return everything recorded so far, for ``merge`` into
+        another registry (a pool worker's timings into its parent's, say).
+        """
+        with self._lock:
+            taken = {"counters": self._counters, "histograms": self._histograms}
+            self._counters, self._histograms = {}, {}
+        return taken
+
+    def merge(self, taken: dict) -> None:
+        """Add what another registry's ``take`` returned to this one."""
+        with self._lock:
+            for name, series in taken["counters"].items():
+                mine = self._counters.setdefault(name, {})
+                for key, value in series.items():
+                    mine[key] = mine.get(key, 0) + value
+            for name, series in taken["histograms"].items():
+                mine = self._histograms.setdefault(name, {})
+                for key, hist in series.items():
+                    if key in mine:
+                        mine[key].merge(hist)
+                    else:
+                        mine[key] = hist
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self.started = time.time()
+
+    def report(self) -> dict:
+        """The whole registry as a JSON-able run report."""
+        with self._lock:
+            counters = {
+                name: [dict(labels, value=value) for labels, value in sorted(series.items())]
+                for name, series in sorted(self._counters.items())
+            }
+            histograms = {
+                name: [
+                    dict(labels, count=h.count, sum=round(h.sum, 6), max=round(h.max, 6),
+                         p50=round(h.quantile(0.5), 6), p95=round(h.quantile(0.95), 6))
+                    for labels, h in sorted(series.items())
+                ]
+                for name, series in sorted(self._histograms.items())
+            }
+        return {
+            "started_at": datetime.fromtimestamp(self.started, timezone.utc).isoformat(),
+            "duration_seconds": round(time.time() - self.started, 3),
+            "counters": counters,
+            "histograms": histograms,
+        }
+
+    def prometheus(self) -> str:
+        """The registry in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                metric = f"{self.prefix}_{name}"
+                lines.append(f"# TYPE {metric} counter")
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{metric}{_prom_labels(labels)} {value:g}")
+            for name, series in sorted(self._histograms.items()):
+                metric = f"{self.prefix}_{name}"
+                lines.append(f"# TYPE {metric} histogram")
+                for labels, h in sorted(series.items()):
+                    cumulative = 0
+                    for bound, n in zip(BUCKETS, h.counts):
+                        cumulative += n
+                        le = 'le="%s"' % ("+Inf" if bound == math.inf else f"{bound:g}")
+                        lines.append(f"{metric}_bucket{_prom_labels(labels, le)} {cumulative}")
+                    lines.append(f"{metric}_sum{_prom_labels(labels)} {h.sum:.6f}")
+                    lines.append(f"{metric}_count{_prom_labels(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self, top: int = 8) -> str:
+        """A few lines for the end of a run: the stages, hosts and helpers that took longest."""
+        with self._lock:
+            stages = sorted(self._histograms.get("stage_seconds", {}).items(), key=lambda kv: -kv[1].sum)[:top]
+            hosts = sorted(self._histograms.get("http_request_seconds", {}).items(), key=lambda kv: -kv[1].sum)[:top]
+            others = sorted(
+                (((("name", name),), h) for name, series in self._histograms.items()
+                 if name not in ("stage_seconds", "http_request_seconds") for h in series.values()),
+                key=lambda kv: -kv[1].sum,
+            )[:top]
+        lines = []
+        for title, rows in (("stage", stages), ("host", hosts), ("time", others)):
+            for labels, h in rows:
+                name = " ".join(v for _, v in labels)
+                lines.append(
+                    f"  {title} {name:<40} {h.count:7d}x  total {h.sum:8.2f}s  "
+                    f"p50 {h.quantile(0.5) * 1000:7.1f}ms  p95 {h.quantile(0.95) * 1000:7.1f}ms"
+                )
+        return "\n".join(lines)
+
+    def export(self, json_path: Optional[str] = None, prom_path: Optional[str] = None) -> None:
+        for path, text in ((json_path, lambda: json.dumps(self.report(), indent=2)), (prom_path, self.prometheus)):
+            if not path:
+                continue
+            tmp = f"{path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(text())
+            os.replace(tmp, path)
+
+    def export_from_env(self) -> None:
+        self.export(os.environ.get("METRICS_JSON"), os.environ.get("METRICS_PROM"))
+
+
+METRICS = Metrics()
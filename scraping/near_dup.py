@@ -0,0 +1,315 @@
+"""
+Cross-source duplicate detection for job rows.
+
+The same posting shows up on several boards under different ``external_id``s,
+so ``NearDupIndex`` matches on content instead. A row is a duplicate of one
+already indexed from another board (rows from the same board are distinct
+postings by definition; see ``board_of``) if either
+
+* its apply URL is the same once canonicalized (tracking parameters,
+  ``www.``, fragments, trailing ``/apply`` etc. stripped), or
+* the MinHash signatures of its normalized company + title + description
+  agree on at least ``threshold`` of their slots (an estimate of the Jaccard
+  similarity of their word 3-shingles) and their titles share at least
+  ``title_threshold`` of their words.
+
+The whole description is fingerprinted, not just its opening: a company's
+postings often share an intro and a benefits/EEO footer, and only the middle
+tells two of its roles apart.
+
+Signatures are bucketed by LSH bands, so a lookup only compares against rows
+that collide in some band rather than the whole inventory. ``seed`` fills
+the index from a Supabase table; a persisted index is instead pruned of rows
+the table no longer has.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import random
+import re
+import struct
+import threading
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+NUM_PERM = 64
+BANDS = 16                    # 16 bands of 4 rows: pairs above ~0.5 similarity usually collide
+SHINGLE = 3                   # words per shingle
+MAX_WORDS = 2000              # description words fingerprinted; caps the cost of very long postings
+PAGE_SIZE = 1000              # rows per paged select when prefetching
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(0x5EED)  # fixed so signatures stay comparable across runs
+_PERMS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_TAG_RE = re.compile(r"<[^>]+>")
+
+TRACKING_PARAMS = {
+    "ref", "referrer", "source", "src", "utm", "gh_src", "lever-source", "lever-origin",
+    "fbclid", "gclid", "mc_cid", "mc_eid", "trk", "trackingid",
+}
+
+Fingerprint = Tuple[Optional[str], FrozenSet[str], Tuple[int, ...]]
+
+
+def canonical_url(url: Optional[str]) -> Optional[str]:
+    """Scheme- and tracking-insensitive form of an apply URL."""
+    if not url:
+        return None
+    parts = urlsplit(url.strip())
+    if not parts.netloc:
+        return None
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    host = host.replace("job-boards.greenhouse.io", "boards.greenhouse.io")
+    path = re.sub(r"/+", "/", parts.path).rstrip("/")
+    if path.endswith("/apply"):
+        path = path[: -len("/apply")]
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=False)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    ]
+    return urlunsplit(("", host, path, urlencode(sorted(query)), ""))[2:]
+
+
+def board_of(key: str) -> Optional[str]:
+    """
+    Where a row key comes from: the host of a URL key, else everything before
+    the last ``:`` of an ``external_id`` such as ``greenhouse:acme:123``.
+    """
+    if "://" in key:
+        host = urlsplit(key).netloc.lower()
+        return host[4:] if host.startswith("www.") else host
+    board, sep, _ = key.rpartition(":")
+    return board if sep else None
+
+
+def words(text: Optional[str]) -> List[str]:
+    return _WORD_RE.findall(_TAG_RE.sub(" ", text or "").lower())
+
+
+def minhash(tokens: List[str]) -> Tuple[int, ...]:
+    """MinHash signature of the word shingles in `tokens`."""
+    if len(tokens) >= SHINGLE:
+        shingles = {" ".join(tokens[i:i + SHINGLE]) for i in range(len(tokens) - SHINGLE + 1)}
+    else:
+        shingles = {" ".join(tokens)}
+    hashes = [
+        int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "little")
+        for s in shingles
+    ]
+    return tuple(min([(a * h + b) % _PRIME for h in hashes]) for a, b in _PERMS)
+
+
+def similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERM
+
+
+def _pack(signature: Tuple[int, ...]) -> str:
+    return base64.b64encode(struct.pack(f"<{NUM_PERM}Q", *signature)).decode()
+
+
+def _unpack(data: str) -> Tuple[int, ...]:
+    return struct.unpack(f"<{NUM_PERM}Q", base64.b64decode(data))
+
+
+class NearDupIndex:
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        threshold: float = 0.7,
+        title_threshold: float = 0.6,
+        url_field: str = "apply_url",
+    ):
+        self.path = path
+        self.threshold = threshold
+        self.title_threshold = title_threshold
+        self.url_field = url_field
+        self._docs: Dict[str, Fingerprint] = {}
+        self._urls: Dict[str, str] = {}
+        self._bands: Dict[Tuple[int, Tuple[int, ...]], Set[str]] = {}
+        self._lock = threading.Lock()
+        self.loaded = False
+        if path and os.path.exists(path):
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def fingerprint(self, job: Dict) -> Fingerprint:
+        title = words(job.get("title"))
+        description = job.get("description") or job.get("description_html")  # scraper plugins keep the raw HTML
+        text = words(job.get("company")) + title + words(description)[:MAX_WORDS]
+        return canonical_url(job.get(self.url_field)), frozenset(title), minhash(text)
+
+    @staticmethod
+    def _band_keys(signature: Tuple[int, ...]):
+        rows = NUM_PERM // BANDS
+        return [(i, signature[i * rows:(i + 1) * rows]) for i in range(BANDS)]
+
+    def _find(self, fp: Fingerprint, board: Optional[str] = None) -> Optional[str]:
+        url, title, signature = fp
+        if url and url in self._urls:
+            match = self._urls[url]
+            if board is None or board_of(match) != board:
+                return match
+        seen: Set[str] = set()
+        for band in self._band_keys(signature):
+            for key in self._bands.get(band, ()):
+                if key in seen:
+                    continue
+                seen.add(key)
+                if board is not None and board_of(key) == board:
+                    continue
+                _, other_title, other_sig = self._docs[key]
+                union = len(title | other_title)
+                if union and len(title & other_title) / union < self.title_threshold:
+                    continue
+                if similarity(signature, other_sig) >= self.threshold:
+                    return key
+        return None
+
+    def _add(self, key: str, fp: Fingerprint) -> None:
+        self._discard(key)
+        self._docs[key] = fp
+        if fp[0]:
+            self._urls.setdefault(fp[0], key)
+        for band in self._band_keys(fp[2]):
+            self._bands.setdefault(band, set()).add(key)
+
+    def _discard(self, key: str) -> None:
+        fp = self._docs.pop(key, None)
+        if fp is None:
+            return
+        if fp[0] and self._urls.get(fp[0]) == key:
+            del self._urls[fp[0]]
+        for band in self._band_keys(fp[2]):
+            bucket = self._bands.get(band)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._bands[band]
+
+    def find(self, job: Dict, key=None) -> Optional[str]:
+        """Key of an indexed row this job duplicates, or None. `key` is the job's own."""
+        fp = self.fingerprint(job)
+        board = board_of(str(key)) if key is not None else None
+        with self._lock:
+            return self._find(fp, board)
+
+    def add(self, key, job: Dict) -> None:
+        fp = self.fingerprint(job)
+        with self._lock:
+            self._add(str(key), fp)
+
+    def discard(self, key) -> None:
+        """Forget a row (e.g. one whose write failed)."""
+        with self._lock:
+            self._discard(str(key))
+
+    def check_and_add(self, key, job: Dict) -> Optional[str]:
+        """
+        Return the key of the row `job` duplicates; otherwise index it under
+        `key` and return None. A row never counts as a duplicate of itself,
+        nor of another row from its own board.
+        """
+        key = str(key)
+        fp = self.fingerprint(job)
+        with self._lock:
+            match = self._find(fp, board_of(key))
+            if match is not None and match != key:
+                return match
+            self._add(key, fp)
+            return None
+
+    def prefetch(self, client, table: str, key_column: str = "external_id") -> int:
+        """Index every row of `table` (used to seed an empty index). Returns rows read."""
+        columns = ",".join(dict.fromkeys([key_column, "title", "company", "description", self.url_field]))
+        read = 0
+        start = 0
+        try:
+            while True:
+                rows = (
+                    client.table(table).select(columns)
+                    .range(start, start + PAGE_SIZE - 1).execute().data or []
+                )
+                for row in rows:
+                    if row.get(key_column) is not None:
+                        self.add(row[key_column], row)
+                read += len(rows)
+                if len(rows) < PAGE_SIZE:
+                    break
+                start += PAGE_SIZE
+        except Exception as e:
+            print(f"  - Could not prefetch {table} rows for duplicate detection: {e}")
+        return read
+
+    def prune(self, client, table: str, key_column: str = "external_id") -> int:
+        """Drop indexed rows whose key is no longer in `table`. Returns rows dropped."""
+        stored: Set[str] = set()
+        start = 0
+        try:
+            while True:
+                rows = (
+                    client.table(table).select(key_column)
+                    .range(start, start + PAGE_SIZE - 1).execute().data or []
+                )
+                stored.update(str(row[key_column]) for row in rows if row.get(key_column) is not None)
+                if len(rows) < PAGE_SIZE:
+                    break
+                start += PAGE_SIZE
+        except Exception as e:
+            # Keeping stale rows only risks a missed posting; guessing would drop live ones
+            print(f"  - Could not list {table} rows to prune the duplicate index: {e}")
+            return 0
+        with self._lock:
+            gone = [key for key in self._docs if key not in stored]
+            for key in gone:
+                self._discard(key)
+        return len(gone)
+
+    def seed(self, client, table: str, key_column: str = "external_id") -> int:
+        """
+        Cover the stored inventory before a run. A persisted index only drops
+        the rows `table` no longer has (closed or deleted postings); otherwise
+        every row is read and indexed. Returns rows read or dropped.
+        """
+        if self.loaded:
+            dropped = self.prune(client, table, key_column)
+            if dropped:
+                print(f"Dropped {dropped} rows no longer in {table} from duplicate detection.")
+            return dropped
+        read = self.prefetch(client, table, key_column)
+        self.loaded = True
+        print(f"Indexed {read} stored {table} rows for duplicate detection.")
+        return read
+
+    def load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"  - Ignoring unreadable duplicate index {self.path}: {e}")
+            return
+        with self._lock:
+            for key, (url, title, signature) in entries.items():
+                self._add(key, (url, frozenset(title), _unpack(signature)))
+        self.loaded = True
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        with self._lock:
+            entries = {
+                key: [url, sorted(title), _pack(signature)]
+                for key, (url, title, signature) in self._docs.items()
+            }
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entries, f)
+        os.replace(tmp, self.path)
+
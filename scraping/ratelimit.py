@@ -0,0 +1,95 @@
+"""
+Per-host request pacing and failure tracking shared by a scraper's threads.
+
+``TokenBucket`` hands out request slots for one host: up to ``burst``
+requests at once, then one every ``interval`` seconds. The interval adapts:
+``slow_down`` doubles it (a host answered 429/503) and ``pause`` holds every
+slot back until a ``Retry-After`` has passed, while each success lets it
+creep back towards the configured base. ``CircuitBreaker`` trips after
+``threshold`` consecutive failures and rejects requests to the host for
+``cooldown`` seconds, then lets a single trial request through.
+"""
+
+import threading
+import time
+
+MAX_INTERVAL = 30.0     # slowest pace a throttled host is pushed down to
+SPEED_UP = 0.9          # interval multiplier after each success
+
+
+class TokenBucket:
+    def __init__(self, interval: float, burst: int = 1):
+        self.base_interval = max(0.0, interval)
+        self.interval = self.base_interval
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()   # may lie in the future while paused
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a slot; returns how many seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            if now > self._updated:
+                if self.interval > 0:
+                    self._tokens = min(self.burst, self._tokens + (now - self._updated) / self.interval)
+                else:
+                    self._tokens = float(self.burst)
+                self._updated = now
+            self._tokens -= 1
+            return max(0.0, self._updated - now) + max(0.0, -self._tokens) * self.interval
+
+    def wait(self) -> None:
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every slot for `seconds` (e.g. a Retry-After)."""
+        with self._lock:
+            until = time.monotonic() + seconds
+            if until > self._updated:
+                self._updated = until
+                self._tokens = 1.0
+
+    def slow_down(self) -> None:
+        with self._lock:
+            self.interval = min(MAX_INTERVAL, max(self.interval * 2, self.base_interval, 0.1))
+
+    def speed_up(self) -> None:
+        with self._lock:
+            if self.interval > self.base_interval:
+                self.interval = max(self.base_interval, self.interval * SPEED_UP)
+
+
+class CircuitBreaker:
+    def __init__(self, threshold: int = 5, cooldown: float = 60.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._failures = 0
+        self._open_until = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """False while open; once the cooldown has passed, lets one trial through."""
+        with self._lock:
+            if self._failures < self.threshold:
+                return True
+            now = time.monotonic()
+            if now < self._open_until:
+                return False
+            self._open_until = now + self.cooldown   # half-open: one trial at a time
+            return True
+
+    def success(self) -> None:
+        with self._lock:
+            self._failures = 0
+
+    def failure(self) -> bool:
+        """Record a failure. Returns True if this one opened the circuit."""
+        with self._lock:
+            self._failures += 1
+            if self._failures == self.threshold:
+                self._open_until = time.monotonic() + self.cooldown
+                return True
+            return False
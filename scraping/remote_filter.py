@@ -0,0 +1,197 @@
+"""
+Remote-eligibility classifier.
+
+The phrase lists are compiled once, at import, into ``PhraseMatcher``s. A
+matcher groups its phrases under a few long, rare "anchor" substrings (for
+example ``" only"`` covers ``"us only"``, ``"uk only"``, ...), finds anchors
+with ``str.find`` and only then verifies the phrases around each hit. That
+keeps plain substring semantics but replaces dozens of full-text scans with a
+handful.
+
+Phrases that contain another listed phrase are dropped from the matcher
+(``"remote - europe"`` can't match without ``"remote - eu"`` matching too),
+so a verdict reports the shortest listed phrase found at that spot.
+
+``RemoteClassifier.classify`` returns a ``Verdict`` saying whether a job is
+open to remote candidates anywhere, why, and which phrase decided it;
+``classify_many`` does the same for a list of jobs in one pass over a joined
+corpus.
+"""
+
+from bisect import bisect_right
+from collections import defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+MIN_ANCHOR = 5
+
+# Phrases used by ats_directory_scraper.is_remote_anywhere
+RESTRICTED_PHRASES = [
+    "us only", "usa only", "united states only", "united kingdom only", "uk only", "eu only",
+    "europe only", "emea only", "apac only", "canada only", "australia only", "new zealand only",
+    "india only", "philippines only", "latin america only", "latam only", "north america only",
+    "south america only", "africa only", "middle east only", "remote - us", "remote (us)",
+    "remote - uk", "remote - eu", "remote - canada", "remote - europe", "remote - emea",
+    "must be located in", "must reside in", "must live in", "eligible to work in",
+    "work authorization", "work authorisation", "citizen only",
+]
+POSITIVE_KEYWORDS = [
+    "remote anywhere", "work from anywhere", "worldwide", "global", "anywhere", "distributed",
+    "remote (global)", "remote - global", "remote - worldwide",
+]
+REMOTE_MARKERS = ["remote", "work from home", "distributed"]
+OPEN_LOCATIONS = ["", "remote", "worldwide", "global", "anywhere"]
+
+# Stricter lists used by the RSS link-resolver's is_worldwide
+WORLDWIDE_RESTRICTED = ["us only", "usa only", "north america", "europe only", "uk only", "canada", "united states"]
+WORLDWIDE_ACCEPTED = ["worldwide", "anywhere in the world", "global", "remote (worldwide)"]
+
+
+class PhraseMatcher:
+    def __init__(self, phrases: Iterable[str], min_anchor: int = MIN_ANCHOR):
+        self.phrases = list(dict.fromkeys(p for p in phrases if p))
+        self._groups: List[Tuple[str, List[Tuple[str, int]]]] = []
+
+        # A phrase containing a shorter listed phrase can never be the only match
+        minimal = [p for p in self.phrases if not any(q != p and q in p for q in self.phrases)]
+
+        # Greedy cover: repeatedly pick the substring shared by the most
+        # remaining phrases (longest on ties), so there are few anchors to scan.
+        uncovered = set(minimal)
+        while uncovered:
+            covers: Dict[str, set] = defaultdict(set)
+            for phrase in uncovered:
+                k = min(min_anchor, len(phrase))
+                for i in range(len(phrase) - k + 1):
+                    for j in range(i + k, len(phrase) + 1):
+                        covers[phrase[i:j]].add(phrase)
+            anchor = max(sorted(covers), key=lambda a: (len(covers[a]), len(a)))
+            members = sorted(covers[anchor])
+            self._groups.append((anchor, [(p, p.index(anchor)) for p in members]))
+            uncovered -= covers[anchor]
+
+    def search_segments(self, text: str, starts: List[int]) -> List[Optional[str]]:
+        """
+        Leftmost matching phrase within each segment of `text`, where segment
+        n begins at ``starts[n]``. After a hit the scan jumps straight to the
+        next segment, so frequent anchors cost one hit per segment at most.
+        """
+        best: List[Optional[Tuple[int, str]]] = [None] * len(starts)
+        ends = starts[1:] + [len(text) + 1]
+        find = text.find
+        startswith = text.startswith
+        for anchor, members in self._groups:
+            i = find(anchor)
+            while i != -1:
+                n = bisect_right(starts, i) - 1
+                hit = None
+                for phrase, offset in members:
+                    start = i - offset
+                    if start >= starts[n] and startswith(phrase, start) and (hit is None or start < hit[0]):
+                        hit = (start, phrase)
+                if hit is None:
+                    i = find(anchor, i + 1)
+                    continue
+                if best[n] is None or hit[0] < best[n][0]:
+                    best[n] = hit
+                i = find(anchor, ends[n])
+        return [hit[1] if hit else None for hit in best]
+
+    def search(self, text: str) -> Optional[str]:
+        """Leftmost matching phrase, or None."""
+        best = None
+        best_start = len(text) + 1
+        find = text.find
+        startswith = text.startswith
+        for anchor, members in self._groups:
+            i = find(anchor)
+            while i != -1 and i < best_start:
+                for phrase, offset in members:
+                    start = i - offset
+                    if 0 <= start < best_start and startswith(phrase, start):
+                        best, best_start = phrase, start
+                i = find(anchor, i + 1)
+        return best
+
+
+class Verdict(NamedTuple):
+    remote: bool
+    reason: str            # "restricted", "explicit", "remote_open_location" or "no_signal"
+    phrase: Optional[str]  # the phrase that decided it, if any
+
+
+class RemoteClassifier:
+    def __init__(
+        self,
+        restricted: Sequence[str],
+        positive: Sequence[str],
+        remote_markers: Sequence[str] = (),
+        open_locations: Sequence[str] = (),
+    ):
+        self.restricted = PhraseMatcher(restricted)
+        self.positive = PhraseMatcher(positive)
+        self.markers = PhraseMatcher(remote_markers)
+        self.open_locations = frozenset(open_locations)
+
+    @staticmethod
+    def _text(title, location, description) -> str:
+        if description is None:
+            return f"{title} {location}".lower()
+        return f"{title} {location} {description}".lower()
+
+    def _open_location(self, location) -> bool:
+        return (location or "").strip().lower() in self.open_locations
+
+    def classify(self, title, location, description=None) -> Verdict:
+        text = self._text(title, location, description)
+        phrase = self.restricted.search(text)
+        if phrase:
+            return Verdict(False, "restricted", phrase)
+        phrase = self.positive.search(text)
+        if phrase:
+            return Verdict(True, "explicit", phrase)
+        if self._open_location(location):
+            phrase = self.markers.search(text)
+            if phrase:
+                return Verdict(True, "remote_open_location", phrase)
+        return Verdict(False, "no_signal", None)
+
+    def classify_many(self, jobs: Iterable[dict]) -> List[Verdict]:
+        """
+        Classify job dicts (``title``/``location``/``description`` keys).
+        Each stage scans one NUL-joined corpus of the jobs still undecided,
+        instead of every text separately.
+        """
+        jobs = list(jobs)
+        texts = [self._text(j.get("title"), j.get("location"), j.get("description")) for j in jobs]
+
+        def scan(matcher: PhraseMatcher, idx: List[int]) -> List[Optional[str]]:
+            starts = []
+            offset = 0
+            for n in idx:
+                starts.append(offset)
+                offset += len(texts[n]) + 1
+            return matcher.search_segments("\0".join(texts[n] for n in idx), starts) if idx else []
+
+        verdicts: List[Optional[Verdict]] = [None] * len(jobs)
+        pending = list(range(len(jobs)))
+
+        for n, phrase in zip(pending, scan(self.restricted, pending)):
+            if phrase:
+                verdicts[n] = Verdict(False, "restricted", phrase)
+        pending = [n for n in pending if verdicts[n] is None]
+
+        for n, phrase in zip(pending, scan(self.positive, pending)):
+            if phrase:
+                verdicts[n] = Verdict(True, "explicit", phrase)
+        pending = [n for n in pending if verdicts[n] is None]
+
+        open_idx = [n for n in pending if self._open_location(jobs[n].get("location"))]
+        for n, phrase in zip(open_idx, scan(self.markers, open_idx)):
+            if phrase:
+                verdicts[n] = Verdict(True, "remote_open_location", phrase)
+
+        return [v or Verdict(False, "no_signal", None) for v in verdicts]
+
+
+REMOTE_ANYWHERE = RemoteClassifier(RESTRICTED_PHRASES, POSITIVE_KEYWORDS, REMOTE_MARKERS, OPEN_LOCATIONS)
+WORLDWIDE = RemoteClassifier(WORLDWIDE_RESTRICTED, WORLDWIDE_ACCEPTED)
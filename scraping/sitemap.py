@@ -0,0 +1,68 @@
+"""
+Streaming sitemap reader.
+
+``iter_sitemap`` consumes an iterable of byte chunks (e.g. a streamed
+``requests`` body), transparently gunzips ``.xml.gz`` payloads, and yields
+``(is_index, loc)`` pairs as soon as each ``<loc>`` closes. Elements are
+discarded after use, so memory stays flat however large the sitemap is,
+and callers can stop early without reading the rest of the document.
+"""
+
+import zlib
+import xml.etree.ElementTree as ET
+from typing import Iterable, Iterator, Tuple
+
+CHUNK_SIZE = 64 * 1024
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _decompressed(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    it = iter(chunks)
+    first = b""
+    for first in it:
+        if first:
+            break
+    if first[:2] == b"\x1f\x8b":
+        inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        yield inflater.decompress(first)
+        for chunk in it:
+            yield inflater.decompress(chunk)
+        yield inflater.flush()
+    else:
+        yield first
+        yield from it
+
+
+def iter_sitemap(chunks: Iterable[bytes]) -> Iterator[Tuple[bool, str]]:
+    """
+    Yield ``(is_index, loc)`` for every ``<loc>`` in a sitemap. `is_index` is
+    True when the document is a ``<sitemapindex>`` (so `loc` is a child
+    sitemap) and False for a ``<urlset>``. Raises ``ET.ParseError`` on
+    malformed XML.
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    root = None
+    is_index = False
+    for chunk in _decompressed(chunks):
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        if not chunk:
+            continue
+        parser.feed(chunk)
+        for event, elem in parser.read_events():
+            if event == "start":
+                if root is None:
+                    root = elem
+                    is_index = _local(elem.tag) == "sitemapindex"
+                continue
+            tag = _local(elem.tag)
+            if tag == "loc":
+                loc = (elem.text or "").strip()
+                if loc:
+                    yield is_index, loc
+            elif tag in ("url", "sitemap") and root is not None:
+                root.clear()  # drop finished entries
+    parser.close()
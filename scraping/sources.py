@@ -0,0 +1,229 @@
+"""
+Source plugins and the orchestrator that runs them.
+
+A source turns its listings into job rows in three steps: ``discover`` lists
+units of work (companies, feeds, index pages), ``fetch`` downloads one unit
+and ``normalize`` turns that payload into rows. Either may be a generator:
+rows are passed on in chunks of ``Source.chunk_size`` as they are produced,
+so a large unit never has to sit in memory whole. ``run_sources`` runs every
+source in its own thread, each with up to ``Source.workers`` fetches in
+flight, and streams the chunks through one bounded queue to a single
+``handle(rows, source_name)`` callback on the calling thread, which is where
+dedup and writes happen. A source that raises or overruns its ``timeout`` is
+reported and dropped without holding up the others.
+
+Per-source timings of each step (``stage_seconds{stage,source}``), failed
+units and rows produced go to ``scraping.metrics.METRICS``.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence
+
+from scraping.metrics import METRICS
+
+QUEUE_SIZE = 64
+_DONE = object()
+
+
+class SourceReport:
+    def __init__(self, name: str):
+        self.name = name
+        self.units = 0          # chunks of rows handed to the write stage
+        self.jobs = 0           # rows handed to the write stage
+        self.errors = 0         # units that failed to fetch or normalize
+        self.write_errors = 0   # units the write stage raised on
+        self.failed: Optional[str] = None   # set if the source itself crashed
+        self.timed_out = False
+        self.seconds = 0.0
+        self.stop = threading.Event()
+
+    def summary(self) -> str:
+        status = "timed out" if self.timed_out else (f"failed ({self.failed})" if self.failed else "ok")
+        return (
+            f"{self.name}: {status}, {self.jobs} jobs in {self.units} chunks, "
+            f"{self.errors + self.write_errors} errors, {self.seconds:.1f}s"
+        )
+
+
+class Source:
+    name = "source"
+    workers = 1                      # concurrent fetches within this source
+    timeout: Optional[float] = None  # seconds for the whole source, None for no limit
+    chunk_size = 50                  # rows per chunk handed to the write stage
+
+    def discover(self) -> Iterable:
+        """Units of work to fetch (companies, feed URLs, index pages...)."""
+        return [None]
+
+    def fetch(self, item):
+        """Download one unit of work; the result goes to ``normalize``."""
+        raise NotImplementedError
+
+    def normalize(self, item, raw) -> Iterable[dict]:
+        """Turn a fetched payload into job rows."""
+        return raw or []
+
+    def finish(self) -> None:
+        """Called once the source has run to completion (not on timeout)."""
+
+    def commit(self) -> None:
+        """
+        Called by the runner once every row from a completed run has been
+        written, e.g. to persist HTTP validators for the pages behind them.
+        """
+
+    def write_failed(self, row: dict) -> None:
+        """Called with every row the write stage gave up on, from any source."""
+
+    def _fetch(self, item):
+        with METRICS.timer("fetch", self.name):
+            return self.fetch(item)
+
+    def _fetch_failed(self, item, error: Exception, report: SourceReport) -> None:
+        report.errors += 1
+        METRICS.inc("errors_total", source=self.name, stage="fetch")
+        print(f"  - {self.name}: could not fetch {item}: {error}")
+
+    def _chunks(self, item, raw, report: SourceReport) -> Iterator[List[dict]]:
+        chunk: List[dict] = []
+        # Time spent inside normalize only, not while the consumer holds a chunk
+        with METRICS.accumulate("normalize", self.name) as spent:
+            try:
+                with spent:
+                    rows = iter(self.normalize(item, raw))
+                while True:
+                    with spent:
+                        row = next(rows, _DONE)
+                    if row is _DONE:
+                        break
+                    chunk.append(row)
+                    if len(chunk) >= self.chunk_size:
+                        yield chunk
+                        chunk = []
+                        if report.stop.is_set():
+                            return
+            except Exception as e:
+                report.errors += 1
+                METRICS.inc("errors_total", source=self.name, stage="normalize")
+                print(f"  - {self.name}: could not process {item}: {e}")
+        if chunk:
+            yield chunk
+
+    def batches(self, report: SourceReport) -> Iterator[List[dict]]:
+        """Chunks of rows in completion order, until `report.stop` is set."""
+        with METRICS.timer("discover", source=self.name):
+            items = self.discover()
+        if self.workers <= 1:
+            for item in items:
+                if report.stop.is_set():
+                    return
+                try:
+                    raw = self._fetch(item)
+                except Exception as e:
+                    self._fetch_failed(item, e, report)
+                    continue
+                yield from self._chunks(item, raw, report)
+            return
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self._fetch, item): item for item in items}
+            try:
+                for future in as_completed(futures):
+                    if report.stop.is_set():
+                        return
+                    item = futures[future]
+                    try:
+                        raw = future.result()
+                    except Exception as e:
+                        self._fetch_failed(item, e, report)
+                        continue
+                    yield from self._chunks(item, raw, report)
+            finally:
+                for future in futures:
+                    future.cancel()
+
+
+def run_sources(
+    sources: Sequence[Source],
+    handle: Callable[[List[dict], str], None],
+    queue_size: int = QUEUE_SIZE,
+) -> List[SourceReport]:
+    """
+    Run `sources` concurrently and call `handle(rows, source_name)` on this
+    thread for every chunk of rows they produce. At most `queue_size` chunks
+    wait between the sources and `handle`. Returns one report per source.
+    """
+    results: "queue.Queue" = queue.Queue(maxsize=queue_size)
+    reports = [SourceReport(source.name) for source in sources]
+
+    def put(report: SourceReport, item) -> bool:
+        # Don't block forever on a full queue once we've been told to stop
+        while True:
+            try:
+                results.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                if report.stop.is_set():
+                    return False
+
+    def run(index: int) -> None:
+        source, report = sources[index], reports[index]
+        started = time.monotonic()
+        try:
+            for rows in source.batches(report):
+                if not put(report, (index, rows)):
+                    return
+            if not report.stop.is_set():
+                source.finish()
+        except Exception as e:
+            report.failed = f"{type(e).__name__}: {e}"
+        finally:
+            if not report.timed_out:
+                report.seconds = time.monotonic() - started
+            put(report, (index, _DONE))
+
+    started = time.monotonic()
+    deadlines = {i: started + s.timeout for i, s in enumerate(sources) if s.timeout}
+    pending = set(range(len(sources)))
+    for index in pending:
+        threading.Thread(target=run, args=(index,), name=f"source-{sources[index].name}", daemon=True).start()
+
+    while pending:
+        now = time.monotonic()
+        for index in [i for i in pending if i in deadlines and deadlines[i] <= now]:
+            report = reports[index]
+            report.timed_out = True
+            report.seconds = now - started
+            report.stop.set()
+            pending.discard(index)
+            print(f"  - {report.name}: timed out after {sources[index].timeout:g}s, dropping it")
+        if not pending:
+            break
+
+        wait = [deadlines[i] - now for i in pending if i in deadlines]
+        try:
+            index, rows = results.get(timeout=max(0.0, min(wait)) if wait else None)
+        except queue.Empty:
+            continue
+        if index not in pending:
+            continue  # late rows from a source that already timed out
+        if rows is _DONE:
+            pending.discard(index)
+            continue
+
+        report = reports[index]
+        report.units += 1
+        report.jobs += len(rows)
+        METRICS.inc("jobs_total", len(rows), source=report.name, outcome="scraped")
+        try:
+            with METRICS.timer("handle", report.name):
+                handle(rows, report.name)
+        except Exception as e:
+            report.write_errors += 1
+            METRICS.inc("errors_total", source=report.name, stage="handle")
+            print(f"  - {report.name}: write stage failed for {len(rows)} rows: {e}")
+
+    return reports
@@ -0,0 +1,231 @@
+"""
+Buffered multi-row writer for job rows.
+
+``BatchWriter`` collects rows and hands them to a sink in batches of
+``batch_size`` (or whenever ``flush_interval`` seconds have passed since the
+last flush). If a batch is rejected, each row in it is retried on its own so
+one bad row doesn't sink its neighbours. With ``background=True`` batches are
+written on a worker thread through a queue of at most ``max_pending`` batches,
+so producers keep going while an upload is in flight and block (rather than
+buffer without limit) when uploads fall behind.
+
+Sinks are plain callables taking a list of rows and raising on failure;
+``supabase_upsert``, ``supabase_update`` and ``rest_upsert`` build the ones
+we use, and ``dry_run`` writes nothing. A sink may return the rows the
+database actually wrote (PostgREST's ``return=representation``): rows missing
+from it were skipped, e.g. by ``ON CONFLICT DO NOTHING``, and are counted as
+``skipped``, not ``saved``. A sink returning None has written everything.
+Sink calls are timed into ``upload_seconds`` in ``scraping.metrics.METRICS``,
+alongside ``rows_written_total{outcome}``.
+"""
+
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from scraping.metrics import METRICS
+
+Row = Dict
+Sink = Callable[[List[Row]], Optional[List[Row]]]
+
+
+def dry_run(rows: List[Row]) -> None:
+    """Sink that writes nothing and reports every row as written (offline replays)."""
+    return None
+
+
+def supabase_upsert(client, table: str, on_conflict: str = "external_id", ignore_duplicates: bool = True) -> Sink:
+    """
+    Multi-row upsert through a supabase-py client. Duplicates are ignored by
+    default so re-sent rows never overwrite fields edited during vetting.
+    """
+    def write(rows: List[Row]) -> List[Row]:
+        # postgrest-py sends `columns=` for multi-row upserts and asks for the
+        # written rows back, so ignored duplicates are missing from `data`
+        return client.table(table).upsert(
+            rows, on_conflict=on_conflict, ignore_duplicates=ignore_duplicates
+        ).execute().data
+    return write
+
+
+def supabase_update(client, table: str, key: str = "external_id") -> Sink:
+    """
+    Update stored rows in place, matching on `key`; only the columns present
+    in each row are touched. One request per row, so keep it for the few rows
+    that changed. Rows that no longer exist come back as skipped.
+    """
+    def write(rows: List[Row]) -> List[Row]:
+        written: List[Row] = []
+        for row in rows:
+            fields = {k: v for k, v in row.items() if k != key}
+            written.extend(client.table(table).update(fields).eq(key, row[key]).execute().data)
+        return written
+    return write
+
+
+def rest_upsert(base_url: str, headers: Dict[str, str], table: str, on_conflict: str, timeout: int = 30) -> Sink:
+    """
+    Multi-row upsert against the Supabase REST endpoint. PostgREST rejects a
+    JSON array whose objects have different keys unless ``columns=`` names
+    them, so rows are sent in one request per distinct key set (normally
+    just one) with their columns listed. Missing keys would otherwise be
+    written as NULL over stored values on a merge.
+    """
+    session = requests.Session()
+    session.headers.update(headers)
+    url = f"{base_url}/rest/v1/{table}"
+    returns_rows = "return=representation" in headers.get("Prefer", "")
+
+    def write(rows: List[Row]) -> Optional[List[Row]]:
+        groups: Dict[Tuple[str, ...], List[Row]] = {}
+        for row in rows:
+            groups.setdefault(tuple(row), []).append(row)
+        written: List[Row] = []
+        for columns, group in groups.items():
+            params = {"on_conflict": on_conflict, "columns": ",".join(f'"{c}"' for c in columns)}
+            resp = session.post(url, params=params, json=group, timeout=timeout)
+            if resp.status_code >= 400:
+                raise RuntimeError(f"{resp.status_code}: {resp.text}")
+            if returns_rows:
+                written.extend(resp.json())
+        return written if returns_rows else None
+    return write
+
+
+class BatchWriter:
+    def __init__(
+        self,
+        sink: Sink,
+        batch_size: int = 100,
+        flush_interval: float = 5.0,
+        key: Optional[str] = "external_id",
+        on_saved: Optional[Callable[[Row], None]] = None,
+        on_skipped: Optional[Callable[[Row], None]] = None,
+        on_failed: Optional[Callable[[Row, Exception], None]] = None,
+        background: bool = False,
+        max_pending: int = 2,
+    ):
+        self.sink = sink
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.key = key
+        self.on_saved = on_saved
+        self.on_skipped = on_skipped
+        self.on_failed = on_failed
+        self.saved = 0
+        self.skipped = 0    # already stored; ignored by the upsert
+        self.failed = 0
+        self._buffer: List[Row] = []
+        self._buffered_keys = set()
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._pending: Optional[queue.Queue] = queue.Queue(maxsize=max(1, max_pending)) if background else None
+        self._worker: Optional[threading.Thread] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+    def add(self, row: Row) -> None:
+        with self._lock:
+            # A single upsert statement can't touch the same key twice
+            k = row.get(self.key) if self.key else None
+            if k is not None:
+                if k in self._buffered_keys:
+                    return
+                self._buffered_keys.add(k)
+            self._buffer.append(row)
+            due = (
+                len(self._buffer) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+            if due:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        """Write everything buffered and wait for background uploads to finish."""
+        with self._lock:
+            self._flush_locked()
+        if self._pending is not None:
+            self._pending.join()
+
+    def _flush_locked(self) -> None:
+        rows, self._buffer = self._buffer, []
+        self._buffered_keys = set()
+        self._last_flush = time.monotonic()
+        if not rows:
+            return
+        if self._pending is None:
+            self._write(rows)
+            return
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._drain, name="batch-writer", daemon=True)
+            self._worker.start()
+        self._pending.put(rows)
+
+    def _drain(self) -> None:
+        while True:
+            rows = self._pending.get()
+            try:
+                self._write(rows)
+            except Exception as e:
+                # A raising callback mustn't stop the worker, or add() and
+                # flush() would wait on it forever
+                print(f"  - Batch of {len(rows)} rows: write callback failed: {e}")
+            finally:
+                self._pending.task_done()
+
+    def _upload(self, rows: List[Row]) -> None:
+        with METRICS.timing("upload_seconds"):
+            returned = self.sink(rows)
+        if returned is None or not self.key:
+            self._mark_saved(rows)
+            return
+        written = {str(row.get(self.key)) for row in returned}
+        self._mark_saved([row for row in rows if str(row.get(self.key)) in written])
+        self._mark_skipped([row for row in rows if str(row.get(self.key)) not in written])
+
+    def _write(self, rows: List[Row]) -> None:
+        try:
+            self._upload(rows)
+        except Exception as batch_error:
+            if len(rows) == 1:
+                self._mark_failed(rows[0], batch_error)
+                return
+            print(f"  - Batch of {len(rows)} rows failed ({batch_error}); retrying row by row")
+            for row in rows:
+                try:
+                    self._upload([row])
+                except Exception as e:
+                    self._mark_failed(row, e)
+
+    def _mark_saved(self, rows: List[Row]) -> None:
+        if not rows:
+            return
+        self.saved += len(rows)
+        METRICS.inc("rows_written_total", len(rows), outcome="saved")
+        if self.on_saved:
+            for row in rows:
+                self.on_saved(row)
+
+    def _mark_skipped(self, rows: List[Row]) -> None:
+        if not rows:
+            return
+        self.skipped += len(rows)
+        METRICS.inc("rows_written_total", len(rows), outcome="skipped")
+        if self.on_skipped:
+            for row in rows:
+                self.on_skipped(row)
+
+    def _mark_failed(self, row: Row, error: Exception) -> None:
+        self.failed += 1
+        METRICS.inc("rows_written_total", outcome="failed")
+        if self.on_failed:
+            self.on_failed(row, error)
+        else:
+            print(f"  - Database error for {row.get(self.key) if self.key else row.get('title')}: {error}")
@@ -0,0 +1,149 @@
+"""Tests for scraping.near_dup: reposts match, a company's other roles don't."""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scraping.near_dup import NearDupIndex, board_of
+
+INTRO = (
+    "<p>About Acme. Acme builds the payments platform that thousands of online businesses "
+    "rely on every day. We are a fully remote team spread over twenty countries, and we "
+    "care about clear writing, kind feedback and shipping small changes often. Our customers "
+    "range from two person startups to public companies, and every one of them trusts us "
+    "with the money that keeps them running. We are backed by great investors, profitable, "
+    "and growing steadily without chasing hype. Every engineer here talks to customers, "
+    "writes the design documents for their own projects and reviews the work of others. "
+    "We keep meetings rare and short, write things down so that people in every time zone "
+    "can follow along, and trust each other to manage our own days.</p>"
+)
+FOOTER = (
+    "<p>What we offer: a competitive salary and equity, a home office budget, four weeks of "
+    "paid vacation plus public holidays, parental leave and a yearly team retreat. Acme is "
+    "an equal opportunity employer and values diversity. We do not discriminate on the "
+    "basis of race, religion, colour, national origin, gender, sexual orientation, age, "
+    "marital status or disability status.</p>"
+)
+BACKEND = (
+    "<p>As a backend engineer you will design and run the services that move money between "
+    "banks, card networks and our ledger. You will own the reconciliation pipeline end to "
+    "end, tune slow Postgres queries, write Go services with careful error handling, and "
+    "take part in an on call rotation with a sane schedule. You have several years of "
+    "experience operating distributed systems in production and enjoy debugging them.</p>"
+)
+FRONTEND = (
+    "<p>As a frontend engineer you will build the dashboard merchants use to follow their "
+    "payouts. You will write React and TypeScript, turn rough designs into accessible "
+    "interfaces, keep the bundle small and fast on slow phones, and work closely with our "
+    "designers on a shared component library. You have shipped polished web applications "
+    "and care about keyboard navigation, screen readers and sensible loading states.</p>"
+)
+
+
+def posting(title, body, apply_url, company="Acme"):
+    return {
+        "title": title,
+        "company": company,
+        "description": INTRO + body + FOOTER,
+        "apply_url": apply_url,
+    }
+
+
+class NearDupIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = NearDupIndex()
+        self.backend = posting("Senior Backend Engineer", BACKEND, "https://boards.greenhouse.io/acme/jobs/1")
+
+    def test_repost_on_another_board_is_a_duplicate(self):
+        self.index.add("greenhouse:acme:1", self.backend)
+        repost = dict(self.backend, apply_url="https://weworkremotely.com/jobs/acme-backend")
+        self.assertEqual(self.index.check_and_add("wwr:feed:99", repost), "greenhouse:acme:1")
+
+    def test_same_apply_url_on_another_board_is_a_duplicate(self):
+        self.index.add("greenhouse:acme:1", self.backend)
+        repost = posting("Backend Engineer (Remote)", "<p>See the link.</p>",
+                         "https://www.boards.greenhouse.io/acme/jobs/1/?utm_source=rss")
+        self.assertEqual(self.index.find(repost, "https://remoteok.com/remote-jobs/5"), "greenhouse:acme:1")
+
+    def test_other_role_at_same_company_is_not_a_duplicate(self):
+        self.index.add("greenhouse:acme:1", self.backend)
+        other = posting("Senior Frontend Engineer", FRONTEND, "https://boards.greenhouse.io/acme/jobs/2")
+        self.assertIsNone(self.index.check_and_add("remoteok:feed:2", other))
+
+    def test_similar_title_at_same_company_is_not_a_duplicate(self):
+        # Titles overlap enough to pass the title check; only the role text differs
+        self.index.add("greenhouse:acme:1", self.backend)
+        other = posting("Senior Backend Engineer, Payouts", FRONTEND, "https://jobs.example.com/acme/7")
+        self.assertIsNone(self.index.check_and_add("remoteok:feed:7", other))
+
+    def test_rows_from_the_same_board_never_match(self):
+        self.index.add("greenhouse:acme:1", self.backend)
+        # Same text, even the same apply URL: still a distinct posting on that board
+        self.assertIsNone(self.index.check_and_add("greenhouse:acme:3", dict(self.backend)))
+        self.assertEqual(len(self.index), 2)
+
+    def test_url_keys_use_the_host_as_board(self):
+        self.assertEqual(board_of("https://www.remoteok.com/remote-jobs/5"), "remoteok.com")
+        self.assertEqual(board_of("lever:acme:abc-123"), "lever:acme")
+        self.assertIsNone(board_of("12345"))
+
+    def test_discard_forgets_a_row(self):
+        self.index.add("greenhouse:acme:1", self.backend)
+        self.index.discard("greenhouse:acme:1")
+        self.assertIsNone(self.index.find(self.backend, "wwr:feed:99"))
+
+
+class FakeTable:
+    """Just enough of a supabase client for a paged select of one table."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.columns = None
+        self.start = self.end = 0
+
+    def table(self, name):
+        return self
+
+    def select(self, columns):
+        self.columns = columns.split(",")
+        return self
+
+    def range(self, start, end):
+        self.start, self.end = start, end
+        return self
+
+    def execute(self):
+        page = self.rows[self.start:self.end + 1]
+        return type("Result", (), {"data": [{c: row.get(c) for c in self.columns} for row in page]})
+
+
+class SeedTest(unittest.TestCase):
+    def setUp(self):
+        self.backend = dict(posting("Senior Backend Engineer", BACKEND, "https://a.example/1"),
+                            external_id="greenhouse:acme:1")
+        self.frontend = dict(posting("Senior Frontend Engineer", FRONTEND, "https://a.example/2"),
+                             external_id="greenhouse:acme:2")
+
+    def test_seeds_without_an_index_file(self):
+        index = NearDupIndex()
+        index.seed(FakeTable([self.backend, self.frontend]), "jobs")
+        self.assertEqual(len(index), 2)
+
+    def test_persisted_index_drops_rows_gone_from_the_table(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "near_dups.json")
+            first = NearDupIndex(path)
+            first.seed(FakeTable([self.backend, self.frontend]), "jobs")
+            first.save()
+
+            second = NearDupIndex(path)
+            self.assertEqual(second.seed(FakeTable([self.frontend]), "jobs"), 1)
+            self.assertEqual(len(second), 1)
+            repost = dict(self.backend, apply_url="https://elsewhere.example/backend")
+            self.assertIsNone(second.find(repost, "wwr:feed:1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
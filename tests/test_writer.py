@@ -0,0 +1,92 @@
+"""Tests for scraping.writer: background batches, flushing and failing sinks."""
+
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scraping.writer import BatchWriter
+
+
+def rows(*ids):
+    return [{"external_id": str(i)} for i in ids]
+
+
+class RecordingSink:
+    """Stores every batch; can be held on an event to keep an upload in flight."""
+
+    def __init__(self, fail_ids=(), gate=None):
+        self.batches = []
+        self.fail_ids = set(fail_ids)
+        self.gate = gate
+
+    def __call__(self, batch):
+        if self.gate is not None:
+            self.gate.wait(5)
+        if any(row["external_id"] in self.fail_ids for row in batch):
+            raise RuntimeError("rejected")
+        self.batches.append([row["external_id"] for row in batch])
+        return None
+
+
+class BackgroundWriterTest(unittest.TestCase):
+    def test_batches_are_written_in_order(self):
+        sink = RecordingSink()
+        writer = BatchWriter(sink, batch_size=2, flush_interval=60, background=True)
+        for row in rows(*range(7)):
+            writer.add(row)
+        writer.flush()
+        self.assertEqual(sink.batches, [["0", "1"], ["2", "3"], ["4", "5"], ["6"]])
+        self.assertEqual(writer.saved, 7)
+
+    def test_flush_waits_for_uploads_in_flight(self):
+        gate = threading.Event()
+        sink = RecordingSink(gate=gate)
+        writer = BatchWriter(sink, batch_size=2, flush_interval=60, background=True)
+        for row in rows(1, 2):
+            writer.add(row)
+        flushed = threading.Event()
+        flusher = threading.Thread(target=lambda: (writer.flush(), flushed.set()))
+        flusher.start()
+        self.assertFalse(flushed.wait(0.2))
+        gate.set()
+        flusher.join(5)
+        self.assertTrue(flushed.is_set())
+        self.assertEqual(sink.batches, [["1", "2"]])
+
+    def test_rejected_rows_go_to_on_failed(self):
+        failed = []
+        sink = RecordingSink(fail_ids={"2"})
+        writer = BatchWriter(sink, batch_size=3, flush_interval=60, background=True,
+                             on_failed=lambda row, e: failed.append(row["external_id"]))
+        for row in rows(1, 2, 3):
+            writer.add(row)
+        writer.flush()
+        # The batch is retried row by row, so only the bad row is lost
+        self.assertEqual(sink.batches, [["1"], ["3"]])
+        self.assertEqual(failed, ["2"])
+        self.assertEqual((writer.saved, writer.failed), (2, 1))
+
+    def test_raising_callback_does_not_stop_the_worker(self):
+        def on_failed(row, error):
+            raise ValueError("callback broke")
+
+        sink = RecordingSink(fail_ids={"1"})
+        writer = BatchWriter(sink, batch_size=1, flush_interval=60, background=True,
+                             max_pending=1, on_failed=on_failed)
+        done = threading.Event()
+
+        def produce():
+            for row in rows(1, 2, 3, 4):
+                writer.add(row)
+            writer.flush()
+            done.set()
+
+        threading.Thread(target=produce, daemon=True).start()
+        self.assertTrue(done.wait(5), "add()/flush() hung after a callback raised")
+        self.assertEqual(sink.batches, [["2"], ["3"], ["4"]])
+
+
+if __name__ == "__main__":
+    unittest.main()